@@ -0,0 +1,187 @@
+"""In-process answer cache for candidate chat.
+
+Answers are cached per (candidate id, profile revision, normalized question,
+digest of the conversation window sent with it) in an LRU with a TTL, and concurrent identical questions from different
+Streamlit sessions share a single upstream LLM call (single-flight). Writes
+through database.py evict every cached answer for the edited candidate.
+
+Sizing is configured through ANSWER_CACHE_SIZE and ANSWER_CACHE_TTL (seconds).
+"""
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from database import register_change_listener
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation."""
+    text = re.sub(r"\s+", " ", (question or "").lower()).strip()
+    return text.rstrip("?!. ")
+
+
+def _history_digest(history):
+    """Short digest of the earlier turns sent with a question ("" for none)."""
+    if not history:
+        return ""
+    text = "\x1e".join(f"{turn['role']}\x1f{turn['content']}" for turn in history)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def answer_key(candidate_data: dict, question: str, history=None):
+    """Cache key for a question about a stored candidate, or None if it can't be cached.
+
+    `history` is the windowed conversation sent along with the question: a
+    follow-up only reuses an answer given after the same earlier turns.
+    """
+    candidate_id = (candidate_data or {}).get("id")
+    if candidate_id is None:
+        return None
+    return (candidate_id, candidate_data.get("revision", 0), normalize_question(question), _history_digest(history))
+
+
+class _Flight:
+    """One in-progress upstream call that concurrent askers can follow."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.chunks = []
+        self.done = False
+        self.error = None
+
+
+class AnswerCache:
+    def __init__(self, max_entries=512, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_candidate(self, candidate_id):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == candidate_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def _join_or_lead(self, key):
+        """Return (cached_value, flight, is_leader) for a lookup, counting hits and misses."""
+        value = self.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+                return value, None, False
+            flight = self._inflight.get(key)
+            if flight is not None:
+                # Someone is already asking upstream; following them counts as a hit
+                self.hits += 1
+                self.coalesced += 1
+                return None, flight, False
+            self.misses += 1
+            flight = self._inflight[key] = _Flight()
+            return None, flight, True
+
+    def _finish(self, key, flight, error=None):
+        # Store before retiring the flight so a new asker can't slip in and re-query upstream
+        if error is None:
+            self.put(key, "".join(flight.chunks))
+        with flight.cond:
+            flight.error = error
+            flight.done = True
+            flight.cond.notify_all()
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached answer or compute it once, however many callers ask at the same time."""
+        return "".join(self.stream(key, lambda: iter([compute()])))
+
+    def stream(self, key, stream_fn):
+        """Yield the answer for `key` in chunks.
+
+        Cache hits yield the whole answer at once. Otherwise the first caller
+        runs `stream_fn()` and every concurrent caller for the same key follows
+        along chunk by chunk. Errors raised by `stream_fn` reach every caller
+        and are not cached.
+        """
+        value, flight, leader = self._join_or_lead(key)
+        if value is not None:
+            yield value
+            return
+
+        if leader:
+            error = None
+            try:
+                for chunk in stream_fn():
+                    with flight.cond:
+                        flight.chunks.append(chunk)
+                        flight.cond.notify_all()
+                    yield chunk
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                self._finish(key, flight, error)
+            return
+
+        sent = 0
+        while True:
+            with flight.cond:
+                while sent == len(flight.chunks) and not flight.done:
+                    flight.cond.wait()
+                chunks = flight.chunks[sent:]
+                done, error = flight.done, flight.error
+            for chunk in chunks:
+                yield chunk
+            sent += len(chunks)
+            if done and sent == len(flight.chunks):
+                if error is not None:
+                    # GeneratorExit etc. mean the leader's session went away mid-answer
+                    raise error if isinstance(error, Exception) else RuntimeError("Answer generation was cancelled.")
+                return
+
+
+ANSWER_CACHE = AnswerCache(
+    max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "512")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+)
+register_change_listener(ANSWER_CACHE.invalidate_candidate)
@@ -1,19 +1,33 @@
 import streamlit as st
+import os
 import json
-import tempfile
-import re
+import time
+import logging
 from database import (
     init_db,
-    get_all_candidate_names,
+    list_candidate_names,
     get_candidate_by_name,
     add_or_update_candidate,
     delete_candidate_by_name,
+    search_candidates,
+    find_candidates_by_skills,
+    skill_counts,
+    get_candidate_by_id,
+    find_duplicates,
+    list_possible_duplicates,
+    dismiss_duplicate,
+    merge_candidates,
 )
-from data_extractor import (
-    extract_text_from_pdf,
-    get_profile_data_from_text,
-    generate_chatbot_response,
-)
+from data_extractor import stream_chatbot_response
+from profile_utils import _strip, parse_skills, clean_experience, clean_education
+from bulk_ingest import ingest_resumes, iter_resume_files, DEFAULT_LLM_CONCURRENCY
+from job_queue import enqueue, get_jobs
+from answer_cache import ANSWER_CACHE
+from matching import match_job_description
+from multi_chat import narrow_candidates, iter_answers, stream_synthesis
+from chat_history import ChatMemory
+import quick_answers
+import metrics
 
 # --- App Configuration ---
 st.set_page_config(
@@ -22,58 +36,25 @@ st.set_page_config(
     layout="wide"
 )
 
+# Prompt sizes and LLM token usage are logged at INFO (set LOG_LEVEL=WARNING to quiet them)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
 # --- Database Initialization ---
 init_db()
+metrics.start_http_server()  # only when METRICS_PORT is set
+
+SEARCH_PAGE_SIZE = 10
+PICKER_PAGE_SIZE = 50
 
 # --- App State Management ---
 if "current_candidate" not in st.session_state:
     st.session_state.current_candidate = None
 if "chats" not in st.session_state:
-    st.session_state.chats = {}
+    st.session_state.chats = ChatMemory()  # persisted turns, keyed by candidate ID
 if "temp_profile" not in st.session_state:
     st.session_state.temp_profile = None
-
-# --- Helpers: cleaning/sanitization ---
-def _strip(v):
-    return v.strip() if isinstance(v, str) else ""
-
-def parse_skills(skills_text: str):
-    parts = re.split(r"[,\n;]", skills_text or "")
-    out, seen = [], set()
-    for p in parts:
-        s = _strip(p)
-        key = s.lower()
-        if s and key not in seen:
-            out.append(s)
-            seen.add(key)
-    return out
-
-def clean_experience(entries):
-    cleaned = []
-    for e in entries or []:
-        company = _strip(e.get("company", ""))
-        title = _strip(e.get("title", ""))
-        duration = _strip(e.get("duration", ""))
-        description = _strip(e.get("description", ""))
-        if company or title or duration or description:
-            cleaned.append({
-                "company": company,
-                "title": title,
-                "duration": duration,
-                "description": description
-            })
-    return cleaned
-
-
-def clean_education(entries):
-    cleaned = []
-    for e in entries or []:
-        degree = _strip(e.get("degree", ""))
-        institution = _strip(e.get("institution", ""))
-        year = _strip(e.get("year", ""))
-        if degree or institution or year:
-            cleaned.append({"degree": degree, "institution": institution, "year": year})
-    return cleaned
+if "parse_jobs" not in st.session_state:
+    st.session_state.parse_jobs = []  # job IDs queued from this session
 
 # --- Helper Functions ---
 def display_profile(data):
@@ -117,6 +98,59 @@ def display_profile(data):
         else:
             st.warning("No skills listed.")
 
+def candidate_button(hit, key):
+    """Sidebar button that opens a candidate from a search or filter result."""
+    if st.button(hit["name"], key=key, disabled=bool(st.session_state.temp_profile)):
+        st.session_state.current_candidate = hit["name"]
+        st.session_state.temp_profile = None
+        st.rerun()
+
+JOB_ICONS = {"queued": "⏳", "running": "⚙️", "done": "✅", "failed": "❌"}
+DUPLICATE_REASONS = {"email": "same email", "phone": "same phone", "similar": "similar resume"}
+
+def parse_jobs_panel():
+    """Status of this session's parse jobs; reruns on a timer while any are pending."""
+    jobs = get_jobs(st.session_state.parse_jobs)
+    counts = {status: 0 for status in JOB_ICONS}
+    for job in jobs:
+        counts[job["status"]] += 1
+
+    for job in jobs:
+        if job["auto_save"]:
+            continue  # bulk jobs are summarized below
+        st.caption(f"{JOB_ICONS[job['status']]} {job['filename']}")
+        if job["status"] == "failed":
+            st.error(f"AI Error: {job['error']}")
+        col1, col2 = st.columns(2)
+        if job["status"] == "done" and col1.button("Review", key=f"review_job_{job['id']}"):
+            st.session_state.temp_profile = job["result"]
+            st.session_state.current_candidate = None  # New candidate mode
+            st.session_state.parse_jobs.remove(job["id"])
+            st.rerun()
+        if job["status"] in ("done", "failed") and col2.button("Dismiss", key=f"dismiss_job_{job['id']}"):
+            st.session_state.parse_jobs.remove(job["id"])
+            st.rerun()
+
+    bulk = [job for job in jobs if job["auto_save"]]
+    if bulk:
+        bulk_counts = {status: sum(job["status"] == status for job in bulk) for status in JOB_ICONS}
+        st.caption("Background import: " + ", ".join(f"{n} {status}" for status, n in bulk_counts.items() if n))
+        for job in bulk:
+            if job["status"] == "failed":
+                st.error(f"{job['filename']}: {job['error']}")
+            elif job["merged"]:
+                st.warning(f"{job['filename']}: same email as candidate #{job['candidate_id']}; merged into it")
+
+    pending = counts["queued"] + counts["running"]
+    waiting = [j for j in jobs if j["status"] == "queued" and time.time() - j["updated_at"] > 10]
+    if waiting and not counts["running"]:
+        st.info("Waiting for a worker. Start one with `python worker.py`.")
+    if not pending and st.session_state.get("parse_jobs_pending"):
+        # Everything just finished: rerun the whole app so saved candidates appear and polling stops
+        st.session_state.parse_jobs_pending = False
+        st.rerun()
+    st.session_state.parse_jobs_pending = bool(pending)
+
 # --- Sidebar for Navigation & Resume Upload ---
 with st.sidebar:
     st.title("🤖 AI HR Assistant")
@@ -127,28 +161,149 @@ with st.sidebar:
     uploaded_file = st.file_uploader("Upload Resume (PDF)", type="pdf")
 
     if uploaded_file and st.button("Parse Resume"):
-        with st.spinner("Analyzing resume..."):
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                tmp_file.write(uploaded_file.getbuffer())
-                temp_file_path = tmp_file.name
-
-            resume_text = extract_text_from_pdf(temp_file_path)
-            if resume_text:
-                profile_data = get_profile_data_from_text(resume_text)
-                if profile_data and "error" not in profile_data:
-                    st.session_state.temp_profile = profile_data
-                    st.session_state.current_candidate = None  # New candidate mode
-                    st.success("Resume parsed! Review details below before saving.")
-                else:
-                    st.error(f"AI Error: {profile_data.get('error', 'Could not extract data.')}")
+        # Parsing runs in worker.py; the sidebar polls the job instead of blocking this run
+        job_id = enqueue(uploaded_file.name, uploaded_file.getvalue())
+        if job_id not in st.session_state.parse_jobs:
+            st.session_state.parse_jobs.append(job_id)
+
+    if st.session_state.parse_jobs:
+        pending = any(j["status"] in ("queued", "running") for j in get_jobs(st.session_state.parse_jobs))
+        st.fragment(parse_jobs_panel, run_every=2 if pending else None)()
+
+    # --- Bulk Import ---
+    with st.expander("📦 Bulk Import (folder or zip)"):
+        bulk_zip = st.file_uploader("Upload Resumes (ZIP)", type="zip", key="bulk_zip")
+        bulk_dir = st.text_input("...or a folder path on the server", key="bulk_dir")
+        bulk_concurrency = st.number_input("Concurrent AI requests", min_value=1, max_value=32,
+                                           value=DEFAULT_LLM_CONCURRENCY)
+
+        if (bulk_zip or bulk_dir) and st.button("Queue in Background"):
+            try:
+                for filename, pdf_bytes in iter_resume_files(bulk_zip or bulk_dir):
+                    job_id = enqueue(filename, pdf_bytes, auto_save=True)
+                    if job_id not in st.session_state.parse_jobs:
+                        st.session_state.parse_jobs.append(job_id)
+            except Exception as e:
+                st.error(f"Import Error: {e}")
+            else:
+                st.rerun()
+
+        if (bulk_zip or bulk_dir) and st.button("Import Now"):
+            progress = st.empty()
+
+            def show_progress(result):
+                icon = "✅" if result["status"] == "saved" else "❌"
+                progress.caption(f"{icon} {result['file']}")
+
+            try:
+                with st.spinner("Importing resumes..."):
+                    summary = ingest_resumes(bulk_zip or bulk_dir, llm_concurrency=int(bulk_concurrency),
+                                             on_result=show_progress)
+            except Exception as e:
+                st.error(f"Import Error: {e}")
             else:
-                st.error("File Error: Could not read text from the PDF.")
+                progress.empty()
+                st.success(f"Imported {summary['saved']}/{summary['total']} resumes in "
+                           f"{summary['elapsed_seconds']}s ({summary['resumes_per_minute']} resumes/min).")
+                for r in summary["results"]:
+                    if r.get("merged"):
+                        st.warning(f"{r['file']}: same email as candidate #{r['candidate_id']}; merged into it")
+                failures = [r for r in summary["results"] if r["status"] == "failed"]
+                for r in failures:
+                    st.error(f"{r['file']}: {r['error']}")
 
     st.markdown("---")
 
     # --- Select Candidate ---
     st.header("Select Candidate")
-    candidate_names = get_all_candidate_names()
+
+    # --- Full-text Search ---
+    search_query = st.text_input("🔎 Search profiles", placeholder="e.g. kafka AND fintech", key="search_query")
+    if search_query:
+        if st.session_state.get("search_for") != search_query:
+            st.session_state.search_for = search_query
+            st.session_state.search_page = 0
+        page = st.session_state.search_page
+        found = search_candidates(search_query, limit=SEARCH_PAGE_SIZE, offset=page * SEARCH_PAGE_SIZE)
+
+        st.caption(f"{found['total']} match(es)")
+        for hit in found["results"]:
+            candidate_button(hit, key=f"search_hit_{hit['id']}")
+            st.caption(hit["snippet"])
+
+        prev_col, next_col = st.columns(2)
+        with prev_col:
+            if page > 0 and st.button("← Prev", key="search_prev"):
+                st.session_state.search_page -= 1
+                st.rerun()
+        with next_col:
+            if (page + 1) * SEARCH_PAGE_SIZE < found["total"] and st.button("Next →", key="search_next"):
+                st.session_state.search_page += 1
+                st.rerun()
+
+    # --- Skill Filter ---
+    with st.expander("🛠️ Filter by skills"):
+        skill_options = [name for name, _ in skill_counts(limit=200)]
+        must_have = st.multiselect("Must have all of", skill_options, key="skills_all")
+        nice_to_have = st.multiselect("At least one of", skill_options, key="skills_any")
+        exclude = st.multiselect("Exclude", skill_options, key="skills_none")
+        if must_have or nice_to_have or exclude:
+            matched = find_candidates_by_skills(all_of=must_have, any_of=nice_to_have, none_of=exclude, limit=25)
+            st.caption(f"{matched['total']} candidate(s)")
+            for hit in matched["results"]:
+                candidate_button(hit, key=f"skill_hit_{hit['id']}")
+
+    # --- Job Description Matching ---
+    with st.expander("🎯 Match a job description"):
+        job_description = st.text_area("Paste the job description", key="job_description")
+        match_count = st.number_input("Candidates to show", min_value=1, max_value=50, value=10)
+        use_rerank = st.checkbox("Let the AI rerank the top 5", value=False)
+        if job_description and st.button("Find best matches"):
+            with st.spinner("Ranking candidates..."):
+                st.session_state.job_matches = match_job_description(
+                    job_description, top_k=int(match_count), rerank_top=5 if use_rerank else 0
+                )
+        matches = st.session_state.get("job_matches")
+        if matches is not None:
+            if not matches:
+                st.caption("No candidates matched this description.")
+            for hit in matches:
+                candidate_button(hit, key=f"match_hit_{hit['id']}")
+                score = f"fit {hit['score']:.2f}"
+                if hit.get("llm_score") is not None:
+                    score += f" · AI {hit['llm_score']}/100"
+                st.caption(f"{score} {hit.get('reason', '')}")
+
+    # --- Possible Duplicates (flagged when candidates are saved) ---
+    possible_duplicates = list_possible_duplicates(limit=10)
+    if possible_duplicates:
+        with st.expander(f"👥 Possible duplicates ({len(possible_duplicates)})"):
+            for pair in possible_duplicates:
+                st.markdown(f"**{pair['name']}** (#{pair['id']}) and **{pair['duplicate_name']}** "
+                            f"(#{pair['duplicate_id']})")
+                st.caption(f"{DUPLICATE_REASONS[pair['reason']]}, {pair['similarity']:.0%}")
+                col1, col2 = st.columns(2)
+                if col1.button("Merge", key=f"merge_{pair['id']}_{pair['duplicate_id']}"):
+                    # Keep the older record; the newer one's details are folded into it
+                    merge_candidates(pair["id"], pair["duplicate_id"])
+                    st.session_state.current_candidate = None
+                    st.rerun()
+                if col2.button("Not a duplicate", key=f"dismiss_{pair['id']}_{pair['duplicate_id']}"):
+                    dismiss_duplicate(pair["id"], pair["duplicate_id"])
+                    st.rerun()
+
+    # --- Candidate Picker (typeahead + keyset pages, never loads every name) ---
+    name_prefix = st.text_input("Filter by name", key="picker_prefix")
+    if st.session_state.get("picker_for") != name_prefix:
+        st.session_state.picker_for = name_prefix
+        st.session_state.picker_cursors = [None]  # `after` cursor for each page visited
+    page = list_candidate_names(prefix=name_prefix, after=st.session_state.picker_cursors[-1],
+                                limit=PICKER_PAGE_SIZE + 1)
+    has_more = len(page) > PICKER_PAGE_SIZE
+    page = page[:PICKER_PAGE_SIZE]
+    candidate_names = [c["name"] for c in page]
+    if st.session_state.current_candidate and st.session_state.current_candidate not in candidate_names:
+        candidate_names.insert(0, st.session_state.current_candidate)
 
     if candidate_names:
         if st.session_state.temp_profile:
@@ -163,17 +318,91 @@ with st.sidebar:
             selected_candidate = st.selectbox("Choose a candidate", options=candidate_names, index=current_index)
             if selected_candidate != st.session_state.current_candidate:
                 st.session_state.current_candidate = selected_candidate
-                st.session_state.chats[selected_candidate] = []  # Reset chat
                 st.session_state.temp_profile = None  # Clear edit state
                 st.rerun()
+
+            prev_col, next_col = st.columns(2)
+            with prev_col:
+                if len(st.session_state.picker_cursors) > 1 and st.button("← Prev names", key="picker_prev"):
+                    st.session_state.picker_cursors.pop()
+                    st.rerun()
+            with next_col:
+                if has_more and st.button("More names →", key="picker_next"):
+                    st.session_state.picker_cursors.append((page[-1]["name"], page[-1]["id"]))
+                    st.rerun()
+    elif name_prefix:
+        st.info("No candidates match that name.")
     else:
         st.info("No candidates in the database. Add one to begin.")
 
+    # --- Ask Across a Shortlist ---
+    with st.expander("🧑‍🤝‍🧑 Ask several candidates"):
+        shortlist_names = {c["id"]: c["name"] for c in page}
+        shortlist_names.update({m["id"]: m["name"] for m in st.session_state.get("job_matches") or []})
+        shortlist_names.update(st.session_state.get("shortlist_names", {}))  # keep picks from earlier pages
+        shortlist = st.multiselect("Shortlist", list(shortlist_names), format_func=shortlist_names.get,
+                                   key="shortlist")
+        st.session_state.shortlist_names = {i: shortlist_names[i] for i in shortlist}
+        panel_question = st.text_input("Question for each", placeholder="Which of them has led a team?")
+        if shortlist and panel_question and st.button("Ask all"):
+            st.session_state.panel_chat = {"question": panel_question, "ids": list(shortlist), "answers": None}
+            st.rerun()
+
+# --- Shortlist Q&A (answers stream in as each candidate finishes) ---
+if st.session_state.get("panel_chat"):
+    panel = st.session_state.panel_chat
+    st.header("🧑‍🤝‍🧑 Shortlist Q&A")
+    st.markdown(f"**{panel['question']}**")
+    if panel["answers"] is None:
+        asked, skipped = narrow_candidates(panel["question"], [get_candidate_by_id(i) for i in panel["ids"]])
+        panel["skipped"] = [p["name"] for p in skipped]
+        if skipped:
+            st.caption(f"Asked the {len(asked)} best-matching profiles; skipped {', '.join(panel['skipped'])}.")
+        answers, summary = [], None
+        for result in iter_answers(panel["question"], asked):
+            answers.append(result)
+            with st.chat_message("assistant"):
+                st.markdown(f"**{result['name']}** · {result['answer']}")
+        if len(answers) > 1:
+            st.markdown("**Across the shortlist**")
+            summary = st.write_stream(stream_synthesis(panel["question"], answers))
+        # Stored only once complete, so a rerun mid-stream asks again instead of showing half the answers
+        panel["answers"], panel["summary"] = answers, summary
+    else:
+        if panel["skipped"]:
+            st.caption(f"Asked the {len(panel['answers'])} best-matching profiles; skipped {', '.join(panel['skipped'])}.")
+        for result in panel["answers"]:
+            with st.chat_message("assistant"):
+                st.markdown(f"**{result['name']}** · {result['answer']}")
+        if panel["summary"]:
+            st.markdown("**Across the shortlist**")
+            st.markdown(panel["summary"])
+    if st.button("Close shortlist answers"):
+        st.session_state.panel_chat = None
+        st.rerun()
+    st.markdown("---")
+
 # --- Editable Form for New Candidate ---
 if st.session_state.temp_profile and not st.session_state.current_candidate:
     st.subheader("✏️ Review & Edit Candidate Details (New Candidate)")
 
+    duplicates = find_duplicates(st.session_state.temp_profile)
+    if duplicates:
+        st.warning("This resume looks like a candidate who is already saved: " + ", ".join(
+            f"**{d['name']}** ({DUPLICATE_REASONS[d['reason']]}, {d['similarity']:.0%})" for d in duplicates
+        ))
+
     with st.form("new_candidate_form", clear_on_submit=False):
+        save_as = None
+        if duplicates:
+            # Emails are unique, so a resume sharing one can only be merged into that candidate
+            same_email = [d for d in duplicates if d["reason"] == "email"]
+            save_as = st.radio(
+                "Save as",
+                same_email or [None] + duplicates,
+                format_func=lambda d: "New candidate" if d is None else f"Merge into {d['name']} (#{d['id']})",
+                index=0 if same_email else 1,
+            )
         name = st.text_input("Name", st.session_state.temp_profile.get("name", ""))
         email = st.text_input("Email", st.session_state.temp_profile.get("email", ""))
         phone = st.text_input("Phone", st.session_state.temp_profile.get("phone", ""))
@@ -223,10 +452,13 @@ if st.session_state.temp_profile and not st.session_state.current_candidate:
                     "experience": clean_experience(experience),   # <-- drops blank rows
                     "education": clean_education(education),     # <-- drops blank rows
                 }
-                add_or_update_candidate(candidate_data)
+                if save_as:
+                    merged_id = merge_candidates(save_as["id"], None, profile_data=candidate_data)
+                    candidate_data = get_candidate_by_id(merged_id)
+                else:
+                    add_or_update_candidate(candidate_data)
                 st.success(f"Candidate {candidate_data['name']} saved successfully!")
                 st.session_state.current_candidate = candidate_data["name"]
-                st.session_state.chats[candidate_data["name"]] = []
                 st.session_state.temp_profile = None
                 st.rerun()
             except Exception as e:
@@ -292,15 +524,8 @@ elif st.session_state.temp_profile and st.session_state.current_candidate:
                 }
                 add_or_update_candidate(candidate_data, candidate_id=st.session_state.temp_profile["id"])
 
-                # --- Handle chat rename (before overwriting current_candidate) ---
-                old_name = st.session_state.current_candidate
+                # Chats are keyed by candidate ID, so a rename keeps the conversation
                 new_name = candidate_data["name"]
-
-                if old_name in st.session_state.chats:
-                    st.session_state.chats[new_name] = st.session_state.chats.pop(old_name)
-                else:
-                    st.session_state.chats[new_name] = []
-
                 st.session_state.current_candidate = new_name
                 st.session_state.temp_profile = None
 
@@ -332,32 +557,46 @@ elif st.session_state.current_candidate:
             if st.button(f"🗑️ Delete {st.session_state.current_candidate}"):
                 delete_candidate_by_name(st.session_state.current_candidate)
                 st.success(f"Candidate {st.session_state.current_candidate} deleted successfully!")
-                if st.session_state.current_candidate in st.session_state.chats:
-                    del st.session_state.chats[st.session_state.current_candidate]
+                st.session_state.chats.forget(candidate_profile["id"])  # stored turns go with the candidate
                 st.session_state.current_candidate = None
                 st.rerun()
 
         st.markdown("---")
         st.header("💬 Chat with AI Assistant")
         st.info(f"You are now chatting about **{st.session_state.current_candidate}**.")
-
-        chat_history = st.session_state.chats[st.session_state.current_candidate]
+        cache_stats = ANSWER_CACHE.stats()
+        fast_path = quick_answers.stats()
+        st.caption(f"Answer cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                   f"({cache_stats['coalesced']} shared in-flight) · Answered from the profile: "
+                   f"{fast_path['hits']} of {fast_path['hits'] + fast_path['misses']} ({fast_path['hit_rate']:.0%})")
+
+        chats = st.session_state.chats
+        candidate_id = candidate_profile["id"]
+        chat_history = chats.turns(candidate_id)
+
+        history_col, clear_col = st.columns(2)
+        with history_col:
+            if chats.has_more(candidate_id) and st.button("⬆️ Load earlier messages"):
+                chats.load_more(candidate_id)
+                st.rerun()
+        with clear_col:
+            if chat_history and st.button("🧹 Clear chat"):
+                chats.clear(candidate_id)
+                st.rerun()
 
         for message in chat_history:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
 
         if prompt := st.chat_input("Ask about their skills, experience, etc."):
-            chat_history.append({"role": "user", "content": prompt})
+            chats.append(candidate_id, "user", prompt)
             with st.chat_message("user"):
                 st.markdown(prompt)
 
             with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    response = generate_chatbot_response(prompt, candidate_profile)
-                    st.markdown(response)
+                response = st.write_stream(stream_chatbot_response(prompt, candidate_profile, history=chat_history))
 
-            chat_history.append({"role": "assistant", "content": response})
+            chats.append(candidate_id, "assistant", response)
     else:
         st.error(f"Could not retrieve data for {st.session_state.current_candidate}.")
 else:
@@ -0,0 +1 @@
+"""Offline benchmarks; see bench/benchmark.py."""
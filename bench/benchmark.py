@@ -0,0 +1,287 @@
+"""Offline performance benchmarks, reported as JSON for comparing runs.
+
+By default an in-process mock LLM (bench/mock_llm.py) stands in for Groq,
+the extraction cache is disabled and the client-side rate limits are lifted,
+so the numbers measure this code rather than the network or the free tier.
+
+    python -m bench.benchmark --output bench-results.json
+    python -m bench.benchmark --only db --db-sizes 1000,10000
+
+Sections:
+- ingest: bulk resume import throughput (synthetic PDFs -> mock LLM -> SQLite)
+- chat: streamed chat latency percentiles and time-to-first-token
+- pdf: PDF text extraction time per page, serial and page-parallel
+- db: database.py operation latencies at each --db-sizes row count
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+from datetime import datetime, timezone
+
+SECTIONS = ("ingest", "chat", "pdf", "db")
+
+FIRST_NAMES = ["Alex", "Priya", "Chen", "Maria", "Omar", "Sofia", "Liam", "Aisha", "Noah", "Yuki", "Ivan", "Fatima"]
+LAST_NAMES = ["Smith", "Patel", "Wang", "Garcia", "Khan", "Rossi", "Brown", "Okafor", "Kim", "Tanaka", "Novak", "Silva"]
+SKILLS = ["Python", "Java", "Go", "JavaScript", "TypeScript", "React", "Node.js", "Django", "Flask", "SQL",
+          "PostgreSQL", "MongoDB", "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform", "Spark",
+          "Pandas", "TensorFlow", "PyTorch", "Excel", "Tableau", "Salesforce", "Figma", "C++", "C#", "Rust"]
+TITLES = ["Software Engineer", "Data Scientist", "Product Manager", "DevOps Engineer", "Data Analyst",
+          "Frontend Developer", "Backend Developer", "ML Engineer", "QA Engineer", "Engineering Manager"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Soylent"]
+QUESTIONS = ["What are their strongest skills?", "How many years of experience do they have?",
+             "How strong is their academic background?", "Would they fit a senior backend role?", "Summarize their last job."]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds (nearest-rank percentiles)."""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))] * 1000, 3)
+
+    return {"n": len(ordered), "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99), "max_ms": round(ordered[-1] * 1000, 3)}
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def synthetic_profile(rng, i):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    jobs = []
+    for j in range(rng.randint(1, 4)):
+        start = rng.randint(2005, 2020)
+        jobs.append({
+            "company": rng.choice(COMPANIES), "title": rng.choice(TITLES),
+            "duration": f"{start} - {start + rng.randint(1, 4)}",
+            "description": f"Worked on {rng.choice(SKILLS)} and {rng.choice(SKILLS)} services for the "
+                           f"{rng.choice(['payments', 'search', 'analytics', 'platform', 'mobile'])} team.",
+        })
+    return {
+        "name": f"{first} {last} {i}",
+        "email": f"{first.lower()}.{last.lower()}.{i}@example.com",
+        "phone": f"+1 555 {i:07d}",
+        "linkedin_profile": "",
+        "summary": f"{rng.choice(TITLES)} with {rng.randint(1, 20)} years of experience.",
+        "skills": rng.sample(SKILLS, rng.randint(3, 8)),
+        "experience": jobs,
+        "education": [{"degree": "BSc", "institution": f"University {rng.randint(1, 50)}",
+                       "year": str(rng.randint(2000, 2020))}],
+    }
+
+
+def resume_text(profile):
+    lines = [profile["name"], f"{profile['email']} | {profile['phone']}", "", "SUMMARY", profile["summary"],
+             "", "EXPERIENCE"]
+    for job in profile["experience"]:
+        lines += [f"{job['title']}, {job['company']}, {job['duration']}", job["description"]]
+    lines += ["", "EDUCATION"] + [f"{e['degree']}, {e['institution']}, {e['year']}" for e in profile["education"]]
+    lines += ["", "SKILLS", ", ".join(profile["skills"])]
+    return "\n".join(lines)
+
+
+def make_pdf(pages):
+    """Minimal text-only PDF with one page per string (Helvetica, no compression)."""
+    n = len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(" ".join(f"{3 + 2 * i} 0 R" for i in range(n)), n),
+    ]
+    font_id = 3 + 2 * n
+    for i, text in enumerate(pages):
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        for line in text.split("\n"):
+            line = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({line}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+                       f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n{obj}\nendobj\n".encode("latin-1", "replace")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+# --- Sections ---
+def bench_ingest(workdir, count, llm_concurrency):
+    import database
+    from bulk_ingest import ingest_resumes
+
+    rng = random.Random(1)
+    source = os.path.join(workdir, "resumes")
+    os.makedirs(source)
+    for i in range(count):
+        with open(os.path.join(source, f"resume_{i:05d}.pdf"), "wb") as f:
+            f.write(make_pdf([resume_text(synthetic_profile(rng, i))]))
+
+    database.DB_NAME = os.path.join(workdir, "ingest.db")
+    database.init_db()
+    summary = ingest_resumes(source, llm_concurrency=llm_concurrency)
+    return {key: summary[key] for key in ("total", "saved", "failed", "elapsed_seconds", "resumes_per_minute")}
+
+
+def bench_chat(count):
+    import quick_answers
+    from data_extractor import stream_chatbot_response
+
+    # Only questions that reach the LLM, so the numbers stay comparable as the local fast path grows
+    questions = [q for q in QUESTIONS if quick_answers.classify(q) is None]
+    rng = random.Random(2)
+    ttft, total = [], []
+    for i in range(count):
+        # No candidate id, so the answer cache never short-circuits the call
+        profile = synthetic_profile(rng, i)
+        start = time.perf_counter()
+        first = None
+        chunks = []
+        for chunk in stream_chatbot_response(rng.choice(questions), profile):
+            if first is None:
+                first = time.perf_counter() - start
+            chunks.append(chunk)
+        total.append(time.perf_counter() - start)
+        ttft.append(first if first is not None else total[-1])
+        if "".join(chunks).startswith("Error:"):
+            return {"error": "".join(chunks)}
+    return {"time_to_first_token": summarize(ttft), "total": summarize(total)}
+
+
+def bench_pdf(pages, repeat):
+    from data_extractor import extract_pages_from_pdf_bytes
+
+    rng = random.Random(3)
+    pdf = make_pdf(["\n".join(resume_text(synthetic_profile(rng, i)) for _ in range(3)) for i in range(pages)])
+    result = {"pages": pages, "bytes": len(pdf)}
+    for mode, parallel in (("serial", False), ("parallel", True)):
+        samples = [timed(extract_pages_from_pdf_bytes, pdf, max_pages=pages, parallel=parallel) for _ in range(repeat)]
+        stats = summarize(samples)
+        stats["per_page_ms"] = round(stats["p50_ms"] / pages, 3)
+        result[mode] = stats
+    return result
+
+
+def bench_db(workdir, size, samples):
+    import database
+    from matching import rank_candidates
+
+    rng = random.Random(size)
+    database.DB_NAME = os.path.join(workdir, f"db_{size}.db")
+    database.init_db()
+
+    profiles = [synthetic_profile(rng, i) for i in range(size)]
+    start = time.perf_counter()
+    for i in range(0, size, 1000):
+        database.add_candidates_bulk(profiles[i:i + 1000])
+    insert_seconds = time.perf_counter() - start
+
+    with database.connection() as conn:
+        ids = [r[0] for r in conn.execute("SELECT id FROM candidates").fetchall()]
+    words = [s.lower() for s in SKILLS] + ["payments", "analytics", "engineer"]
+    ops = {
+        "get_candidate_by_id": lambda: database.get_candidate_by_id.uncached(rng.choice(ids)),
+        "get_candidate_by_id_cached": lambda: database.get_candidate_by_id(ids[0]),
+        "search_candidates": lambda: database.search_candidates.uncached(rng.choice(words)),
+        "find_candidates_by_skills": lambda: database.find_candidates_by_skills(
+            all_of=rng.sample(SKILLS, 2), limit=50),
+        "list_candidate_names": lambda: database.list_candidate_names.uncached(prefix=rng.choice(FIRST_NAMES)[:2]),
+        "skill_counts": lambda: database.skill_counts.uncached(),
+        "find_duplicates": lambda: database.find_duplicates(rng.choice(profiles)),
+        "add_or_update_candidate": lambda: database.add_or_update_candidate(
+            synthetic_profile(rng, size + rng.randint(0, 10 ** 6))),
+    }
+    result = {"rows": size, "bulk_insert_rows_per_second": round(size / insert_seconds, 1)}
+    for name, op in ops.items():
+        result[name] = summarize([timed(op) for _ in range(samples)])
+
+    # The first ranking after a write rebuilds the TF-IDF matrix; later ones reuse it
+    query = "Senior Python engineer with Kubernetes and PostgreSQL experience"
+    result["rank_candidates_cold"] = summarize([timed(rank_candidates, query)])
+    result["rank_candidates_warm"] = summarize([timed(rank_candidates, query) for _ in range(min(samples, 20))])
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run offline benchmarks and print the results as JSON.")
+    parser.add_argument("--only", help=f"comma-separated sections to run ({', '.join(SECTIONS)})")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--base-url", help="benchmark against this API instead of the built-in mock")
+    parser.add_argument("--latency", type=float, default=200, help="mock latency in ms")
+    parser.add_argument("--jitter", type=float, default=50, help="mock latency jitter in ms")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="fraction of mock requests answered with 429")
+    parser.add_argument("--resumes", type=int, default=50, help="resumes to ingest")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--chat-requests", type=int, default=50)
+    parser.add_argument("--pdf-pages", type=int, default=20)
+    parser.add_argument("--pdf-repeat", type=int, default=5)
+    parser.add_argument("--db-sizes", default="1000,10000,100000")
+    parser.add_argument("--db-samples", type=int, default=200, help="timed calls per database operation")
+    args = parser.parse_args(argv)
+    sections = args.only.split(",") if args.only else list(SECTIONS)
+
+    # Must be set before the app modules read their configuration at import time
+    os.environ["EXTRACTION_CACHE_MAX_MB"] = "0"
+    server = None
+    if args.base_url:
+        os.environ["GROQ_BASE_URL"] = args.base_url
+    else:
+        from bench.mock_llm import start_in_thread
+        server, base_url = start_in_thread(latency=args.latency / 1000, jitter=args.jitter / 1000,
+                                           rate_limit=args.rate_limit)
+        os.environ.update({"GROQ_BASE_URL": base_url, "GROQ_API_KEY": "mock", "GROQ_RPM": "0", "GROQ_TPM": "0",
+                           "GROQ_MAX_CONCURRENCY": str(max(8, args.llm_concurrency))})
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "llm": args.base_url or "mock",
+            "args": vars(args),
+        }
+    }
+    with tempfile.TemporaryDirectory(prefix="hr-bench-") as workdir:
+        if "pdf" in sections:
+            report["pdf"] = bench_pdf(args.pdf_pages, args.pdf_repeat)
+        if "chat" in sections:
+            report["chat"] = bench_chat(args.chat_requests)
+        if "ingest" in sections:
+            report["ingest"] = bench_ingest(workdir, args.resumes, args.llm_concurrency)
+        if "db" in sections:
+            report["db"] = [bench_db(workdir, int(size), args.db_samples) for size in args.db_sizes.split(",")]
+    if server is not None:
+        report["meta"]["mock_requests"] = server.RequestHandlerClass.config.requests
+        report["meta"]["mock_rejected"] = server.RequestHandlerClass.config.rejected
+        server.shutdown()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
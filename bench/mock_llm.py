@@ -0,0 +1,193 @@
+"""Local stand-in for an OpenAI-compatible /chat/completions endpoint.
+
+Answers JSON-mode requests with a canned profile and everything else with a
+canned answer, optionally streamed as server-sent events. Latency, jitter,
+per-chunk streaming delay and the share of requests rejected with 429 are
+configurable, so the app and the benchmarks can run without network access:
+
+    python -m bench.mock_llm --port 8765 --latency 300 --jitter 100 --rate-limit 0.05
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=mock streamlit run app.py
+"""
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+CANNED_PROFILE = {
+    "name": "Jane Doe",
+    "email": "jane.doe@example.com",
+    "phone": "+1 415 555 0134",
+    "summary": "Backend engineer with eight years of experience building data-heavy web services.",
+    "skills": ["Python", "Django", "PostgreSQL", "Kubernetes", "AWS"],
+    "experience": [
+        {"company": "Acme Corp", "title": "Senior Software Engineer", "duration": "2019 - Present",
+         "description": "Leads the payments platform team; moved billing to event-driven services."},
+        {"company": "Globex", "title": "Software Engineer", "duration": "2015 - 2019",
+         "description": "Built internal APIs and the reporting pipeline."},
+    ],
+    "education": [{"degree": "BSc Computer Science", "institution": "State University", "year": "2015"}],
+    "linkedin_profile": "",
+}
+CANNED_ANSWER = ("Based on the profile, the candidate has solid backend experience with Python and "
+                 "PostgreSQL and has led a team, which fits a senior engineering role.")
+
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+
+class MockConfig:
+    def __init__(self, latency=0.2, jitter=0.05, chunk_delay=0.01, rate_limit=0.0,
+                 retry_after=1, profile=None, answer=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_delay = chunk_delay
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.profile = profile or CANNED_PROFILE
+        self.answer = answer or CANNED_ANSWER
+        self.requests = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+
+def _content(config, body):
+    prompt = body["messages"][-1]["content"]
+    if body.get("response_format", {}).get("type") == "json_object":
+        if "rankings" in prompt:
+            ids = re.findall(r'"id":\s*"?(\d+)', prompt)
+            return json.dumps({"rankings": [{"id": i, "score": 50, "reason": "Canned ranking."} for i in ids]})
+        profile = dict(config.profile)
+        # Echo the resume's email so bulk imports don't collapse into one candidate
+        email = _EMAIL_RE.search(prompt)
+        if email:
+            profile["email"] = email.group(0)
+            profile["name"] = email.group(0).split("@")[0].replace(".", " ").title()
+        return json.dumps(profile)
+    return config.answer
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = MockConfig()
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=()):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data):
+        self.wfile.write(b"%x\r\n" % len(data) + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        config = self.config
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+
+        with config.lock:
+            config.requests += 1
+            rejected = random.random() < config.rate_limit
+            config.rejected += rejected
+        if rejected:
+            self._send_json(429, {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit"}},
+                            headers=[("Retry-After", str(config.retry_after))])
+            return
+
+        time.sleep(max(0.0, config.latency + random.uniform(-config.jitter, config.jitter)))
+        content = _content(config, body)
+        prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                 "total_tokens": prompt_tokens + len(content) // 4}
+
+        if not body.get("stream"):
+            self._send_json(200, {
+                "id": "mock", "object": "chat.completion", "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pieces = re.findall(r"\S+\s*", content)
+        for i, piece in enumerate(pieces):
+            event = {"choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            if i == len(pieces) - 1:
+                event["x_groq"] = {"usage": usage}
+            self._chunk(b"data: " + json.dumps(event).encode("utf-8") + b"\n\n")
+            time.sleep(config.chunk_delay)
+        self._chunk(b"data: [DONE]\n\n")
+        self._chunk(b"")
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping idle keep-alive connections is normal; stay quiet about it
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def make_server(port=0, host="127.0.0.1", **config):
+    """A threaded HTTP server serving the mock API; port 0 picks a free port."""
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": MockConfig(**config)})
+    return MockServer((host, port), handler)
+
+
+def start_in_thread(**config):
+    """Start the mock on a free port in a daemon thread; returns (server, base_url)."""
+    server = make_server(**config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible mock LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=200, help="mean response latency in ms")
+    parser.add_argument("--jitter", type=float, default=50, help="uniform +/- jitter in ms")
+    parser.add_argument("--chunk-delay", type=float, default=10, help="delay between streamed chunks in ms")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--profile-json", help="file with the canned profile returned in JSON mode")
+    parser.add_argument("--answer", help="canned chat answer")
+    args = parser.parse_args(argv)
+
+    profile = None
+    if args.profile_json:
+        with open(args.profile_json, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    server = make_server(
+        port=args.port, host=args.host, latency=args.latency / 1000, jitter=args.jitter / 1000,
+        chunk_delay=args.chunk_delay / 1000, rate_limit=args.rate_limit, retry_after=args.retry_after,
+        profile=profile, answer=args.answer,
+    )
+    print(f"Mock LLM listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Bulk resume ingestion from a folder or zip archive.
+
+PDF text is extracted in a process pool, LLM extraction runs in a bounded
+thread pool, and parsed profiles are written to the database in batched
+transactions. Usage:
+
+    python bulk_ingest.py resumes/ --llm-concurrency 8 --batch-size 50
+"""
+import os
+import sys
+import time
+import zipfile
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from database import init_db, add_candidates_bulk
+from data_extractor import extract_pages_from_pdf_bytes, get_profile_data_from_text
+from profile_utils import clean_profile
+
+DEFAULT_EXTRACT_WORKERS = os.cpu_count() or 2
+DEFAULT_LLM_CONCURRENCY = int(os.getenv("INGEST_LLM_CONCURRENCY", "4"))
+DEFAULT_BATCH_SIZE = 25
+
+
+def iter_resume_files(source):
+    """Yield (filename, pdf_bytes) for every PDF in a directory or zip archive.
+
+    `source` may be a directory path, a zip file path, or a binary file-like
+    object holding a zip archive (e.g. a Streamlit upload).
+    """
+    if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for filename in sorted(files):
+                if filename.lower().endswith(".pdf"):
+                    path = os.path.join(root, filename)
+                    with open(path, "rb") as f:
+                        yield os.path.relpath(path, source), f.read()
+        return
+
+    if not zipfile.is_zipfile(source):
+        raise ValueError(f"Not a directory or zip archive: {source}")
+
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            filename = info.filename
+            if info.is_dir() or not filename.lower().endswith(".pdf"):
+                continue
+            # Skip macOS resource-fork entries that ship inside many zips
+            if filename.startswith("__MACOSX/") or os.path.basename(filename).startswith("._"):
+                continue
+            yield filename, archive.read(info)
+
+
+def _parse_profile(filename, pages):
+    """LLM stage: turn extracted page text into a cleaned profile ready to save."""
+    profile_data = get_profile_data_from_text("".join(pages), pages=pages)
+    if not profile_data or "error" in profile_data:
+        raise RuntimeError((profile_data or {}).get("error", "Could not extract data."))
+    profile = clean_profile(profile_data)
+    if not profile["name"]:
+        # Keep the resume rather than drop it; the recruiter can rename later
+        profile["name"] = os.path.splitext(os.path.basename(filename))[0]
+    return profile
+
+
+def ingest_resumes(source, extract_workers=DEFAULT_EXTRACT_WORKERS,
+                   llm_concurrency=DEFAULT_LLM_CONCURRENCY,
+                   batch_size=DEFAULT_BATCH_SIZE, on_result=None):
+    """Parse and save every resume in `source`.
+
+    `on_result` is called with each per-file result dict as soon as that file
+    is saved or fails. Returns a summary dict with per-file results and
+    overall throughput.
+    """
+    init_db()
+    started = time.perf_counter()
+    results = []
+    batch = []
+
+    def report(result):
+        results.append(result)
+        if on_result:
+            on_result(result)
+
+    def fail(filename, error):
+        report({"file": filename, "status": "failed", "error": str(error)})
+
+    def flush():
+        if not batch:
+            return
+        try:
+            saved = add_candidates_bulk([profile for _, profile in batch])
+        except Exception as e:
+            for filename, _ in batch:
+                fail(filename, f"Database error: {e}")
+        else:
+            for (filename, profile), (candidate_id, merged) in zip(batch, saved):
+                # A resume whose email is already stored was merged into that candidate
+                report({"file": filename, "status": "saved", "candidate_id": candidate_id, "name": profile["name"],
+                        "merged": merged})
+        batch.clear()
+
+    # Spawn rather than fork: the Streamlit server calling this is multi-threaded
+    pdf_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=extract_workers, mp_context=pdf_context) as pdf_pool, \
+            ThreadPoolExecutor(max_workers=llm_concurrency) as llm_pool:
+        pending = {}
+        try:
+            for filename, pdf_bytes in iter_resume_files(source):
+                # Files are already spread across processes; don't fan out pages as well
+                future = pdf_pool.submit(extract_pages_from_pdf_bytes, pdf_bytes, parallel=False)
+                pending[future] = ("extract", filename)
+        except Exception as e:
+            fail(str(source), e)
+
+        # Extraction results feed the LLM pool; LLM results feed the DB batches.
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, filename = pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    fail(filename, e)
+                    continue
+
+                if stage == "extract":
+                    if "".join(value).strip():
+                        pending[llm_pool.submit(_parse_profile, filename, value)] = ("llm", filename)
+                    else:
+                        fail(filename, "Could not read text from the PDF.")
+                else:
+                    batch.append((filename, value))
+                    if len(batch) >= batch_size:
+                        flush()
+        flush()
+
+    elapsed = time.perf_counter() - started
+    saved = sum(1 for r in results if r["status"] == "saved")
+    return {
+        "total": len(results),
+        "saved": saved,
+        "merged": sum(1 for r in results if r.get("merged")),
+        "failed": len(results) - saved,
+        "elapsed_seconds": round(elapsed, 2),
+        "resumes_per_minute": round(len(results) / elapsed * 60, 1) if elapsed else 0.0,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-ingest resumes from a folder or zip archive.")
+    parser.add_argument("source", help="Directory of PDFs or a .zip archive")
+    parser.add_argument("--workers", type=int, default=DEFAULT_EXTRACT_WORKERS,
+                        help="PDF extraction processes (default: CPU count)")
+    parser.add_argument("--llm-concurrency", type=int, default=DEFAULT_LLM_CONCURRENCY,
+                        help="Concurrent LLM extraction requests (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Profiles written per database transaction (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    def print_result(result):
+        if result["status"] == "saved" and result["merged"]:
+            print(f"[merged] {result['file']} -> same email as candidate id {result['candidate_id']}")
+        elif result["status"] == "saved":
+            print(f"[ok]     {result['file']} -> {result['name']} (id {result['candidate_id']})")
+        else:
+            print(f"[failed] {result['file']}: {result['error']}")
+
+    summary = ingest_resumes(args.source, extract_workers=args.workers,
+                             llm_concurrency=args.llm_concurrency,
+                             batch_size=args.batch_size, on_result=print_result)
+    print(f"\nIngested {summary['saved']}/{summary['total']} resumes ({summary['merged']} merged into existing "
+          f"candidates) in {summary['elapsed_seconds']}s ({summary['resumes_per_minute']} resumes/min)")
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
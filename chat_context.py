@@ -0,0 +1,170 @@
+"""Token-budgeted profile context for candidate chat prompts.
+
+Instead of sending the whole profile with indent=2 on every question, only
+the sections relevant to the question are serialized as compact JSON (no
+indentation, no empty or internal fields), capped at CHAT_PROMPT_TOKEN_BUDGET
+tokens. Earlier turns of the conversation are windowed to the most recent
+ones that fit CHAT_HISTORY_TOKEN_BUDGET.
+"""
+import os
+import re
+import json
+
+CHAT_PROMPT_TOKEN_BUDGET = int(os.getenv("CHAT_PROMPT_TOKEN_BUDGET", "1200"))
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "600"))
+
+# Fields the UI and database use that carry no meaning for the model
+INTERNAL_FIELDS = {"id", "revision"}
+
+SECTIONS = {
+    "contact": ("email", "phone", "linkedin_profile"),
+    "summary": ("summary",),
+    "skills": ("skills",),
+    "experience": ("experience",),
+    "education": ("education",),
+}
+
+FILL_ORDER = ["contact", "skills", "education", "summary", "experience"]
+
+def _words(*words):
+    """Regex matching any of `words` as whole words; a trailing * allows any ending ("compan*")."""
+    return r"\b(?:" + "|".join(re.escape(w[:-1]) + r"\w*" if w.endswith("*") else re.escape(w) for w in words) + r")\b"
+
+
+SECTION_KEYWORDS = {
+    "contact": _words("e-mail*", "email*", "mail", "phone*", "telephone", "mobile", "contact*", "call", "reach",
+                      "linkedin"),
+    "summary": _words("summary", "bio", "objective"),
+    "skills": _words("skill*", "tech*", "stack", "know*", "language*", "tool*", "framework*", "librar*", "proficien*",
+                     "expert*", "certif*"),
+    "experience": _words("experience*", "work*", "job*", "role*", "position*", "compan*", "employ*", "career*",
+                         "year", "years", "led", "lead*", "manag*", "team*", "project*", "built", "build*",
+                         "responsib*", "history", "senior*", "junior", "intern", "internship*", "current*", "recent*",
+                         "previous*"),
+    "education": _words("educat*", "degree*", "stud*", "universit*", "college*", "school*", "graduat*", "qualific*",
+                        "academic*", "gpa", "bachelor*", "master*", "phd", "diploma*", "major*"),
+}
+
+
+# Evaluative or open-ended questions need the whole profile (within the budget), not one section
+OPEN_ENDED = _words("summari*", "overview", "background", "introduc*", "who is", "tell me about them",
+                    "tell me about him", "tell me about her", "tell me about the candidate", "fit", "fits", "suitab*",
+                    "strength*", "weakness*", "hire", "hiring", "recommend*", "assess*", "evaluat*", "opinion*",
+                    "impress*", "red flag*", "concern*", "compar*", "good", "best", "why", "should", "would")
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), matching the LLM client's estimate."""
+    return len(text) // 4
+
+
+def compact_json(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _prune(value):
+    """Drop empty strings, lists and dicts recursively."""
+    if isinstance(value, dict):
+        pruned = {k: _prune(v) for k, v in value.items() if k not in INTERNAL_FIELDS}
+        return {k: v for k, v in pruned.items() if v not in ("", None, [], {})}
+    if isinstance(value, list):
+        return [v for v in (_prune(v) for v in value) if v not in ("", None, [], {})]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _mentions(question, values):
+    """True when the question names one of the profile's own values (a skill, company, school...)."""
+    for value in values:
+        if isinstance(value, str) and len(value) > 1 and re.search(rf"(?<!\w){re.escape(value.lower())}(?!\w)", question):
+            return True
+    return False
+
+
+def relevant_sections(profile, question):
+    """Profile sections a targeted question is about; every section for open-ended questions."""
+    q = (question or "").lower()
+    if re.search(OPEN_ENDED, q):
+        return list(FILL_ORDER)
+    matched = [name for name, pattern in SECTION_KEYWORDS.items() if re.search(pattern, q)]
+    if _mentions(q, profile.get("skills") or []) and "skills" not in matched:
+        matched.append("skills")
+    companies = [e.get("company") for e in profile.get("experience") or [] if isinstance(e, dict)]
+    if _mentions(q, companies) and "experience" not in matched:
+        matched.append("experience")
+    schools = [e.get("institution") for e in profile.get("education") or [] if isinstance(e, dict)]
+    if _mentions(q, schools) and "education" not in matched:
+        matched.append("education")
+    # Small sections first so one long experience list can't crowd them out of the budget
+    return sorted(matched or SECTIONS, key=FILL_ORDER.index)
+
+
+def _fit_list(items, budget):
+    """Keep whole entries while they fit, then one entry with its description truncated."""
+    kept, used = [], 2
+    for item in items:
+        cost = estimate_tokens(compact_json(item)) + 1
+        if used + cost <= budget:
+            kept.append(item)
+            used += cost
+            continue
+        if isinstance(item, dict) and item.get("description"):
+            room = (budget - used - estimate_tokens(compact_json({**item, "description": ""})) - 1) * 4
+            if room > 40:
+                kept.append({**item, "description": item["description"][:room].rstrip() + "…"})
+        break
+    return kept
+
+
+def build_profile_context(candidate_data, question, token_budget=None):
+    """Return (compact profile JSON, info) for the question, within the token budget.
+
+    `info` reports the sections included and the estimated profile tokens.
+    """
+    budget = CHAT_PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+    profile = _prune(candidate_data or {})
+    sections = relevant_sections(profile, question)
+
+    context = {"name": profile["name"]} if profile.get("name") else {}
+    used = estimate_tokens(compact_json(context))
+    for section in sections:
+        for field in SECTIONS[section]:
+            value = profile.get(field)
+            if value is None:
+                continue
+            cost = estimate_tokens(compact_json({field: value}))
+            if used + cost <= budget:
+                context[field] = value
+                used += cost
+            elif isinstance(value, list):
+                fitted = _fit_list(value, budget - used - estimate_tokens(compact_json({field: []})))
+                if fitted:
+                    context[field] = fitted
+                    used += estimate_tokens(compact_json({field: fitted}))
+            elif isinstance(value, str) and budget - used > 20:
+                context[field] = value[:(budget - used - 10) * 4].rstrip() + "…"
+                used = budget
+
+    text = compact_json(context)
+    return text, {"sections": sections, "profile_tokens": estimate_tokens(text), "budget": budget}
+
+
+def window_history(turns, token_budget=None):
+    """The most recent whole turns that fit the budget, oldest first, as chat messages.
+
+    An answer whose question fell outside the window is dropped too, so the
+    window always starts with a user turn.
+    """
+    budget = CHAT_HISTORY_TOKEN_BUDGET if token_budget is None else token_budget
+    window, used = [], 0
+    for turn in reversed(turns or []):
+        cost = estimate_tokens(turn["content"]) + 4  # role and message framing
+        if used + cost > budget:
+            break
+        window.append({"role": turn["role"], "content": turn["content"]})
+        used += cost
+    window.reverse()
+    while window and window[0]["role"] != "user":
+        window.pop(0)
+    return window
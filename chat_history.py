@@ -0,0 +1,117 @@
+"""Chat turns persisted per candidate, with a bounded in-memory window.
+
+Every question and answer is stored in the chat_turns table, keyed by
+candidate ID so a rename keeps the conversation and deleting the candidate
+removes it. A ChatMemory (one per Streamlit session) loads the most recent
+CHAT_PAGE_SIZE turns when a candidate is opened, fetches older pages on
+request, and keeps at most CHAT_MEMORY_MAX_TURNS turns in memory, evicting
+the least recently viewed candidates first.
+"""
+import os
+import time
+from collections import OrderedDict
+
+from database import connection, transaction
+
+CHAT_PAGE_SIZE = int(os.getenv("CHAT_PAGE_SIZE", "20"))
+CHAT_MEMORY_MAX_TURNS = int(os.getenv("CHAT_MEMORY_MAX_TURNS", "200"))
+
+
+def add_turn(candidate_id, role, content):
+    """Store one turn and return it as {"id", "role", "content", "created_at"}."""
+    now = time.time()
+    with transaction() as cursor:
+        cursor.execute(
+            "INSERT INTO chat_turns (candidate_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+            (candidate_id, role, content, now),
+        )
+        turn_id = cursor.lastrowid
+    return {"id": turn_id, "role": role, "content": content, "created_at": now}
+
+
+def load_turns(candidate_id, before=None, limit=None):
+    """The latest `limit` turns older than turn ID `before` (all turns when None), oldest first."""
+    limit = limit or CHAT_PAGE_SIZE
+    with connection() as conn:
+        rows = conn.execute("""
+            SELECT id, role, content, created_at FROM chat_turns
+            WHERE candidate_id = ? AND id < ?
+            ORDER BY id DESC
+            LIMIT ?
+        """, (candidate_id, before if before is not None else 2 ** 63 - 1, limit)).fetchall()
+    return [{"id": r[0], "role": r[1], "content": r[2], "created_at": r[3]} for r in reversed(rows)]
+
+
+def delete_turns(candidate_id):
+    with transaction() as cursor:
+        cursor.execute("DELETE FROM chat_turns WHERE candidate_id = ?", (candidate_id,))
+
+
+class ChatMemory:
+    """Loaded turns per candidate in an LRU capped at `max_turns` turns in total."""
+
+    def __init__(self, max_turns=None, page_size=None):
+        self.max_turns = max_turns or CHAT_MEMORY_MAX_TURNS
+        self.page_size = page_size or CHAT_PAGE_SIZE
+        self._chats = OrderedDict()  # candidate_id -> {"turns": [...], "has_more": bool}
+
+    def _chat(self, candidate_id):
+        chat = self._chats.get(candidate_id)
+        if chat is None:
+            turns = load_turns(candidate_id, limit=self.page_size + 1)
+            chat = self._chats[candidate_id] = {"turns": turns[-self.page_size:],
+                                                "has_more": len(turns) > self.page_size}
+        self._chats.move_to_end(candidate_id)
+        return chat
+
+    def _evict(self):
+        total = sum(len(chat["turns"]) for chat in self._chats.values())
+        while total > self.max_turns and len(self._chats) > 1:
+            _, chat = self._chats.popitem(last=False)
+            total -= len(chat["turns"])
+        if total > self.max_turns:
+            # One long conversation alone is over the cap: keep its newest turns, the rest stay on disk
+            chat = next(iter(self._chats.values()))
+            chat["turns"] = chat["turns"][-self.max_turns:]
+            chat["has_more"] = True
+
+    def turns(self, candidate_id):
+        """Loaded turns for a candidate, oldest first (the latest page on first access)."""
+        chat = self._chat(candidate_id)
+        self._evict()
+        return list(chat["turns"])
+
+    def has_more(self, candidate_id):
+        return self._chat(candidate_id)["has_more"]
+
+    def load_more(self, candidate_id):
+        """Load the next page of older turns; returns how many were added."""
+        chat = self._chat(candidate_id)
+        before = chat["turns"][0]["id"] if chat["turns"] else None
+        older = load_turns(candidate_id, before=before, limit=self.page_size + 1)
+        chat["has_more"] = len(older) > self.page_size
+        older = older[-self.page_size:]
+        chat["turns"] = older + chat["turns"]
+        # Make room elsewhere first; this candidate is the most recently used so it goes last
+        self._evict()
+        return len(older)
+
+    def append(self, candidate_id, role, content):
+        """Persist a turn and add it to the loaded window."""
+        chat = self._chat(candidate_id)
+        turn = add_turn(candidate_id, role, content)
+        chat["turns"].append(turn)
+        self._evict()
+        return turn
+
+    def clear(self, candidate_id):
+        """Delete a candidate's stored conversation."""
+        delete_turns(candidate_id)
+        self._chats[candidate_id] = {"turns": [], "has_more": False}
+
+    def forget(self, candidate_id):
+        """Drop a candidate's loaded turns from memory (e.g. after it was deleted)."""
+        self._chats.pop(candidate_id, None)
+
+    def loaded_turns(self):
+        return sum(len(chat["turns"]) for chat in self._chats.values())
@@ -1,57 +1,188 @@
+import io
 import os
 import json
-import requests
-from PyPDF2 import PdfReader
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dotenv import load_dotenv
 
+import metrics
+import extraction_cache
+from llm_client import get_client, estimate_tokens, LLMError
+from answer_cache import ANSWER_CACHE, answer_key
+from chat_context import build_profile_context, window_history
+from quick_answers import answer_locally
+from resume_preprocess import preprocess_resume, split_windows
+from profile_utils import merge_profiles
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
 MODEL_NAME = "llama-3.1-8b-instant"  # Supported Groq model
+# Bump whenever the extraction prompt changes so cached profiles are re-extracted
+PROMPT_VERSION = "4"
+
+# PDF extraction limits
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30"))
+PDF_MAX_BYTES = int(float(os.getenv("PDF_MAX_MB", "10")) * 1024 * 1024)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+PDF_WORKERS = os.cpu_count() or 2
 
+@metrics.timed("query_llm")
 def query_llm(payload):
     """Send request to Groq using OpenAI-compatible chat completions."""
     if not GROQ_API_KEY:
         return {"error": "Groq API key missing in .env"}
 
-    headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
     try:
-        resp = requests.post(f"{GROQ_BASE_URL}/chat/completions", headers=headers, json=payload)
-        resp.raise_for_status()
-        return resp.json()
-    except requests.exceptions.HTTPError as http_err:
-        return {"error": f"HTTP {resp.status_code}: {resp.text}"}
+        return get_client(GROQ_BASE_URL, GROQ_API_KEY).chat_completion(payload)
     except Exception as e:
         return {"error": str(e)}
 
+@metrics.timed("extract_text_from_pdf")
 def extract_text_from_pdf(pdf_path):
     """Extract text from PDF file."""
     try:
         with open(pdf_path, "rb") as file:
-            reader = PdfReader(file)
-            text = "".join(page.extract_text() or "" for page in reader.pages)
-        return text
+            pdf_bytes = file.read()
     except Exception as e:
         print(f"Error reading PDF: {e}")
         return None
+    return extract_text_from_pdf_bytes(pdf_bytes)
+
+class PDFExtractionError(Exception):
+    """Raised when a PDF can't be read or exceeds the configured limits."""
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+def _get_page_pool():
+    """The process pool shared by every page-parallel extraction in this process.
+
+    Workers are spawned rather than forked: callers (the Streamlit server, the
+    job worker) are multi-threaded, and forking a threaded process can
+    deadlock on locks held by other threads.
+    """
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _page_pool
+
+def _reset_page_pool(pool):
+    """Drop a broken pool (a worker process died) so the next call starts a new one."""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is pool:
+            _page_pool = None
+    pool.shutdown(wait=False)
+
+def _extract_page_range(pdf_bytes: bytes, start: int, stop: int):
+    """Worker: text of pages [start, stop). Runs in a separate process for large PDFs."""
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
 
-def get_profile_data_from_text(resume_text: str):
-    """Extract structured candidate profile from resume text with forced JSON mode."""
+@metrics.timed("extract_pdf_pages")
+def extract_pages_from_pdf_bytes(pdf_bytes: bytes, max_pages=None, max_bytes=None, parallel=True):
+    """Extract text per page from in-memory PDF bytes.
+
+    Files over `max_bytes` are rejected; only the first `max_pages` pages are
+    read. PDFs with at least PDF_PARALLEL_MIN_PAGES pages are split into page
+    ranges extracted in a shared process pool (PyPDF2 is pure Python, so
+    threads wouldn't help); pass parallel=False from code that is already
+    running in a pool process. Raises PDFExtractionError.
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_bytes = PDF_MAX_BYTES if max_bytes is None else max_bytes
+    if max_bytes and len(pdf_bytes) > max_bytes:
+        raise PDFExtractionError(
+            f"PDF is {len(pdf_bytes) / 1048576:.1f} MB; the limit is {max_bytes / 1048576:.1f} MB."
+        )
+
+    cache_key = f"{extraction_cache.file_hash(pdf_bytes)}:{max_pages}"
+    cached = extraction_cache.get_text(cache_key)
+    if cached is not None:
+        return json.loads(cached)
+
+    from PyPDF2 import PdfReader  # imported on first use; it is slow to import
+
+    try:
+        page_count = len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+    except Exception as e:
+        raise PDFExtractionError(f"Could not open PDF: {e}")
+    if max_pages and page_count > max_pages:
+        logger.warning("PDF has %d pages; extracting the first %d", page_count, max_pages)
+        page_count = max_pages
+
+    try:
+        workers = 1
+        if parallel and page_count >= PDF_PARALLEL_MIN_PAGES:
+            # A few pages per process at least, so shipping and re-parsing the file pays off
+            workers = min(PDF_WORKERS, page_count // 4)
+        if workers > 1:
+            step = -(-page_count // workers)
+            ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+            pool = _get_page_pool()
+            try:
+                futures = [pool.submit(_extract_page_range, pdf_bytes, start, stop) for start, stop in ranges]
+                pages = [text for future in futures for text in future.result()]
+            except BrokenProcessPool:
+                _reset_page_pool(pool)
+                raise
+        else:
+            pages = _extract_page_range(pdf_bytes, 0, page_count)
+    except Exception as e:
+        raise PDFExtractionError(f"Could not extract text: {e}")
+
+    if any(pages):
+        extraction_cache.put_text(cache_key, json.dumps(pages))
+    return pages
+
+def extract_text_from_pdf_bytes(pdf_bytes: bytes, parallel=True):
+    """Extract text from in-memory PDF bytes (used by uploads and bulk ingest)."""
+    try:
+        return "".join(extract_pages_from_pdf_bytes(pdf_bytes, parallel=parallel))
+    except PDFExtractionError as e:
+        print(f"Error reading PDF: {e}")
+        return None
+
+# Extraction fields and how the prompt describes them
+PROFILE_FIELDS = {
+    "name": "name",
+    "email": "email",
+    "phone": "phone",
+    "summary": "summary",
+    "skills": "skills (list of strings)",
+    "experience": "experience (list of objects: company, title, duration, description)",
+    "education": "education (list of objects: degree, institution, year)",
+    "linkedin_profile": "linkedin_profile (string URL if available)",
+}
+
+# Resumes whose trimmed text is longer than this are extracted in chunks
+CHUNKED_EXTRACTION_MIN_CHARS = int(os.getenv("CHUNKED_EXTRACTION_MIN_CHARS", "6000"))
+EXTRACTION_CHUNK_CHARS = int(os.getenv("EXTRACTION_CHUNK_CHARS", "4000"))
+EXTRACTION_CHUNK_OVERLAP = 400
+EXTRACTION_CHUNK_WORKERS = 8
+
+def _extract_fields(text: str, fields):
+    """One JSON-mode extraction call for `fields` over `text`; returns a dict or {"error": ...}."""
+    field_list = "\n".join(f"- {PROFILE_FIELDS[f]}" for f in fields)
     prompt = f"""
 Extract the following candidate details from the resume and return ONLY valid JSON:
 
-- name
-- email
-- phone
-- summary
-- skills (list of strings)
-- experience (list of objects: company, title, duration, description)
-- education (list of objects: degree, institution, year)
-- linkedin_profile (string URL if available)
+{field_list}
+
+Keep each experience description to one or two sentences.
 
 Resume:
-{resume_text}
+{text}
 """
 
     payload = {
@@ -64,6 +195,7 @@ Resume:
         "max_tokens": 800,
         "response_format": {"type": "json_object"}  # 👈 forces valid JSON
     }
+    logger.info("extraction prompt: ~%d tokens", estimate_tokens(payload) - payload["max_tokens"])
 
     response = query_llm(payload)
     if "error" in response:
@@ -71,35 +203,207 @@ Resume:
 
     try:
         content = response["choices"][0]["message"]["content"]
-        return json.loads(content)
+        with metrics.span("json_decode"):
+            profile = json.loads(content)
     except Exception as e:
         return {"error": f"JSON parsing error: {e}", "raw": response}
+    if not isinstance(profile, dict):
+        return {"error": "JSON parsing error: expected an object", "raw": response}
+    return profile
 
-def generate_chatbot_response(user_message: str, candidate_data: dict):
-    """Generate chatbot response based on candidate profile."""
-    profile_json = json.dumps(candidate_data, indent=2)
-    prompt = f"""
-Here is a candidate profile:
+def _extraction_chunks(pre, fields):
+    """Split a long resume into (text, fields) chunks that each fit one extraction call."""
+    sections = pre["sections"]
+    if not set(sections) - {"header"}:
+        # No recognizable headings: overlapping windows, every field from each
+        windows = split_windows(pre["llm_text"], EXTRACTION_CHUNK_CHARS, EXTRACTION_CHUNK_OVERLAP)
+        return [(w, fields) for w in windows]
+
+    def block(*names):
+        return "\n\n".join(f"{n.upper()}\n{sections[n]}" for n in names if sections.get(n))
+
+    head_fields = [f for f in fields if f not in ("experience", "education")]
+    head = "\n\n".join(p for p in (pre["header"], block("summary", "skills", "certifications")) if p)
+    chunks = [(head, head_fields)]
+    for window in split_windows(sections.get("experience", ""), EXTRACTION_CHUNK_CHARS, EXTRACTION_CHUNK_OVERLAP):
+        chunks.append((f"EXPERIENCE\n{window}", ["experience"]))
+    for window in split_windows(block("education", "projects"), EXTRACTION_CHUNK_CHARS, EXTRACTION_CHUNK_OVERLAP):
+        chunks.append((window, ["education"]))
+    return [c for c in chunks if c[0].strip()]
+
+def _extract_chunked(pre, fields):
+    """Extract chunks concurrently and merge them into one profile.
+
+    Calls go through the shared LLM client, whose semaphore and rate limiter
+    bound the real concurrency across the whole process.
+    """
+    chunks = _extraction_chunks(pre, fields)
+    logger.info("chunked extraction: %d chunks", len(chunks))
+    with ThreadPoolExecutor(max_workers=min(len(chunks), EXTRACTION_CHUNK_WORKERS)) as pool:
+        parts = list(pool.map(lambda chunk: _extract_fields(*chunk), chunks))
+    for part in parts:
+        if "error" in part:
+            return part
+    return merge_profiles(parts)
+
+@metrics.timed("get_profile_data_from_text")
+def get_profile_data_from_text(resume_text: str, pages=None):
+    """Extract structured candidate profile from resume text with forced JSON mode.
+
+    Contact fields are found locally (see resume_preprocess.py) and only the
+    sections that need structuring are sent to the model. Pass the per-page
+    text as `pages` to also strip running headers and footers. Long resumes
+    are split into chunks that are extracted in parallel and merged.
+    """
+    cache_key = extraction_cache.profile_key(resume_text, MODEL_NAME, PROMPT_VERSION)
+    cached = extraction_cache.get_profile(cache_key)
+    if cached is not None:
+        return cached
+
+    pre = preprocess_resume(resume_text, pages)
+    contact = pre["contact"]
+    # Emails and LinkedIn URLs found locally are exact; a phone-like number isn't, so the model is still asked
+    fields = [f for f in PROFILE_FIELDS if f == "phone" or not contact.get(f)]
+
+    if len(pre["llm_text"]) > CHUNKED_EXTRACTION_MIN_CHARS:
+        profile = _extract_chunked(pre, fields)
+    else:
+        profile = _extract_fields(pre["llm_text"], fields)
+
+    if "error" not in profile:
+        # Prefer exact regex hits over the model's transcription; the phone only fills a gap
+        for field, value in contact.items():
+            if value and (field != "phone" or not profile.get("phone")):
+                profile[field] = value
+        extraction_cache.put_profile(cache_key, profile)
+    return profile
+
+def _chatbot_payload(user_message: str, candidate_data: dict, history=None):
+    """Build the chat completion payload for a question about one candidate.
+
+    `history` holds earlier turns already windowed by window_history; they go
+    before the question as plain messages, without the profile.
+    """
+    profile_json, info = build_profile_context(candidate_data, user_message)
+    prompt = f"""Candidate profile (JSON):
 {profile_json}
 
-User question: {user_message}
-"""
+User question: {user_message}"""
 
     payload = {
         "model": MODEL_NAME,
         "messages": [
             {"role": "system", "content": "You are an HR assistant answering based only on the provided candidate profile."},
+            *(history or []),
             {"role": "user", "content": prompt}
         ],
         "temperature": 0.5,
         "max_tokens": 500
     }
+    prompt_tokens = estimate_tokens(payload) - payload["max_tokens"]
+    metrics.inc("chat_prompt_tokens", info["profile_tokens"], part="profile")
+    metrics.inc("chat_prompt_tokens", prompt_tokens, part="total")
+    logger.info(
+        "Chat prompt: sections=%s profile_tokens~%d history_turns=%d prompt_tokens~%d budget=%d",
+        ",".join(info["sections"]), info["profile_tokens"], len(history or []), prompt_tokens, info["budget"],
+    )
+    return payload
 
-    response = query_llm(payload)
+def _chat_content(response):
     if "error" in response:
-        return response["error"]
-
+        raise LLMError(response["error"])
     try:
         return response["choices"][0]["message"]["content"]
     except Exception:
-        return "Error: Could not parse chatbot response."
+        raise LLMError("Error: Could not parse chatbot response.")
+
+@metrics.timed("generate_chatbot_response")
+def generate_chatbot_response(user_message: str, candidate_data: dict, history=None):
+    """Generate chatbot response based on candidate profile and the earlier turns in `history`."""
+    local = answer_locally(user_message, candidate_data)
+    if local is not None:
+        return local
+
+    history = window_history(history)
+    payload = _chatbot_payload(user_message, candidate_data, history)
+    compute = lambda: _chat_content(query_llm(payload))
+
+    try:
+        key = answer_key(candidate_data, user_message, history)
+        if key is None:
+            return compute()
+        return ANSWER_CACHE.get_or_compute(key, compute)
+    except LLMError as e:
+        return str(e)
+
+@metrics.timed("stream_chatbot_response")
+def stream_chatbot_response(user_message: str, candidate_data: dict, history=None):
+    """Stream the chatbot response as text chunks, for st.write_stream."""
+    local = answer_locally(user_message, candidate_data)
+    if local is not None:
+        yield local
+        return
+
+    if not GROQ_API_KEY:
+        yield "Groq API key missing in .env"
+        return
+
+    history = window_history(history)
+    payload = _chatbot_payload(user_message, candidate_data, history)
+    stream_fn = lambda: get_client(GROQ_BASE_URL, GROQ_API_KEY).stream_chat_completion(payload)
+    try:
+        key = answer_key(candidate_data, user_message, history)
+        if key is None:
+            yield from stream_fn()
+        else:
+            yield from ANSWER_CACHE.stream(key, stream_fn)
+    except Exception as e:
+        yield f"Error: {e}"
+
+def rerank_candidates_for_job(job_description: str, profiles: list):
+    """Ask the LLM to score a short list of candidate profiles (0-100) against a job description."""
+    compact = [
+        {
+            "id": p["id"],
+            "name": p.get("name"),
+            "summary": p.get("summary"),
+            "skills": p.get("skills"),
+            "experience": [
+                {k: e.get(k) for k in ("title", "company", "duration")}
+                for e in p.get("experience") or [] if isinstance(e, dict)
+            ],
+        }
+        for p in profiles
+    ]
+    prompt = f"""
+Score how well each candidate fits the job description from 0 to 100.
+Return ONLY valid JSON: {{"rankings": [{{"id": <candidate id>, "score": <0-100>, "reason": "<one sentence>"}}]}}
+
+Job description:
+{job_description}
+
+Candidates:
+{json.dumps(compact, separators=(",", ":"))}
+"""
+
+    payload = {
+        "model": MODEL_NAME,
+        "messages": [
+            {"role": "system", "content": "You are an expert technical recruiter ranking candidates for a role."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.0,
+        "max_tokens": 100 + 60 * len(profiles),
+        "response_format": {"type": "json_object"}
+    }
+
+    response = query_llm(payload)
+    if "error" in response:
+        return response
+
+    try:
+        result = json.loads(response["choices"][0]["message"]["content"])
+        rankings = [r for r in result.get("rankings", []) if isinstance(r, dict) and "id" in r]
+        return {"rankings": rankings}
+    except Exception as e:
+        return {"error": f"JSON parsing error: {e}"}
@@ -1,29 +1,388 @@
+import os
 import sqlite3
 import json
+import threading
+import functools
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import metrics
+import dedupe
+from profile_utils import parse_skills, merge_profiles
+from skills import normalize_skill
+from matching import profile_features, serialize_features
 
 DB_NAME = "candidates.db"
 
-def init_db():
-    """Initializes the database and creates the candidates table if it doesn't exist."""
-    with sqlite3.connect(DB_NAME, timeout=10) as conn:
-        cursor = conn.cursor()
+# Callables notified with a candidate ID whenever that candidate changes
+_change_listeners = []
+
+def register_change_listener(callback):
+    """Call `callback(candidate_id)` after every write that touches a candidate."""
+    if callback not in _change_listeners:
+        _change_listeners.append(callback)
+
+def _notify_change(candidate_ids):
+    for candidate_id in candidate_ids:
+        for callback in _change_listeners:
+            try:
+                callback(candidate_id)
+            except Exception as e:
+                print(f"Change listener failed: {e}")
+
+# --- Connections ---
+# A bounded pool of long-lived connections shared by every thread. Streamlit
+# runs each rerun on a new thread, so per-thread connections would be reopened
+# (PRAGMAs and all) on nearly every interaction; pooled ones are reused and
+# keep sqlite3's prepared-statement cache warm.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+_pool = []  # idle (db_name, connection), most recently used last
+_pool_lock = threading.Lock()
+_pool_slots = threading.BoundedSemaphore(DB_POOL_SIZE)
+_held = threading.local()  # the connection this thread has checked out, if any
+_init_lock = threading.Lock()
+_initialized = set()
+
+def _connect():
+    conn = sqlite3.connect(DB_NAME, timeout=30, isolation_level=None, cached_statements=256,
+                           check_same_thread=False)
+    conn.execute("PRAGMA synchronous=NORMAL")     # safe with WAL, avoids an fsync per commit
+    conn.execute("PRAGMA cache_size=-16000")      # 16 MB page cache
+    conn.execute("PRAGMA mmap_size=268435456")    # 256 MB memory-mapped reads
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+@contextmanager
+def connection():
+    """Check out a pooled connection to DB_NAME for the duration of the block.
+
+    Waits while DB_POOL_SIZE connections are in use. A nested checkout in the
+    same thread (e.g. a read inside a transaction) gets the same connection.
+    """
+    conn = getattr(_held, "conn", None)
+    if conn is not None:
+        yield conn
+        return
+
+    with _pool_slots:
+        db_name = DB_NAME
+        with _pool_lock:
+            while _pool and conn is None:
+                idle_name, idle = _pool.pop()
+                if idle_name == db_name:
+                    conn = idle
+                else:
+                    idle.close()  # DB_NAME changed (benchmarks, tests)
+        if conn is None:
+            conn = _connect()
+        _held.conn = conn
+        try:
+            yield conn
+        finally:
+            _held.conn = None
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            with _pool_lock:
+                _pool.append((db_name, conn))
+
+@contextmanager
+def transaction():
+    """Run a write transaction, taking the write lock up front.
+
+    BEGIN IMMEDIATE waits on busy_timeout for other writers instead of failing
+    with "database is locked" when a read transaction tries to upgrade.
+    """
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn.cursor()
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+# --- Schema migrations ---
+def _migration_1(cursor):
+    """Base candidates table, plus the revision counter bumped on every profile edit."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT,
+            phone TEXT,
+            summary TEXT,
+            skills_json TEXT,
+            experience_json TEXT,
+            education_json TEXT,
+            linkedin_json TEXT
+        )
+    """)
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(candidates)")}
+    if "revision" not in columns:
+        cursor.execute("ALTER TABLE candidates ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+
+def _ensure_unique_email_index(cursor):
+    """Make non-empty emails unique (case-insensitive); False while stored rows still share one."""
+    try:
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_candidates_email
+            ON candidates(lower(email)) WHERE email <> ''
+        """)
+        return True
+    except sqlite3.IntegrityError:
+        return False
+
+def _migration_2(cursor):
+    """Index name lookups/sorting and make non-empty emails unique (case-insensitive)."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidates_name ON candidates(name)")
+    if not _ensure_unique_email_index(cursor):
+        # Existing rows share an email; keep them and fall back to a plain index under another
+        # name, so init_db can add the unique one once the duplicates are merged
+        print("Warning: duplicate candidate emails found; email uniqueness is not enforced until they are merged.")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_candidates_email_lookup ON candidates(lower(email)) WHERE email <> ''"
+        )
+
+def _fts_values(alias):
+    """SQL expressions flattening a candidates row into the text indexed by candidates_fts."""
+    def items(column, kind):
+        return f"json_each(CASE WHEN json_valid({alias}.{column}) THEN {alias}.{column} ELSE '[]' END) WHERE type='{kind}'"
+
+    def fields(column, keys):
+        parts = " || ' ' || ".join(f"coalesce(json_extract(value, '$.{k}'), '')" for k in keys)
+        return f"(SELECT group_concat({parts}, ' ') FROM {items(column, 'object')})"
+
+    return ", ".join([
+        f"{alias}.id",
+        f"{alias}.name",
+        f"{alias}.summary",
+        f"(SELECT group_concat(value, ', ') FROM {items('skills_json', 'text')})",
+        fields("experience_json", ["title", "company", "duration", "description"]),
+        fields("education_json", ["degree", "institution", "year"]),
+    ])
+
+def _migration_3(cursor):
+    """Full-text index over names, summaries, skills, experience and education, synced by triggers."""
+    try:
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS candidates (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT,
-                phone TEXT,
-                summary TEXT,
-                skills_json TEXT,
-                experience_json TEXT,
-                education_json TEXT,
-                linkedin_json TEXT
+            CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+                name, summary, skills, experience, education,
+                tokenize='unicode61 remove_diacritics 2'
             )
         """)
-        conn.commit()
+    except sqlite3.OperationalError as e:
+        print(f"Warning: full-text search unavailable ({e}); falling back to LIKE queries.")
+        return
+    columns = "rowid, name, summary, skills, experience, education"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_insert AFTER INSERT ON candidates BEGIN
+            INSERT INTO candidates_fts ({columns}) SELECT {_fts_values('NEW')};
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_delete AFTER DELETE ON candidates BEGIN
+            DELETE FROM candidates_fts WHERE rowid = OLD.id;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_update AFTER UPDATE ON candidates BEGIN
+            DELETE FROM candidates_fts WHERE rowid = OLD.id;
+            INSERT INTO candidates_fts ({columns}) SELECT {_fts_values('NEW')};
+        END
+    """)
+    cursor.execute("DELETE FROM candidates_fts")
+    cursor.execute(f"INSERT INTO candidates_fts ({columns}) SELECT {_fts_values('c')} FROM candidates AS c")
 
-def add_or_update_candidate(profile_data, candidate_id=None):
-    """Adds a new candidate or updates an existing one by ID."""
+def _migration_4(cursor):
+    """Normalized skills inverted index (skill -> candidates) for indexed skill filtering."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS skills (
+            id INTEGER PRIMARY KEY,
+            key TEXT NOT NULL UNIQUE,
+            display TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_skills (
+            candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+            skill_id INTEGER NOT NULL REFERENCES skills(id),
+            PRIMARY KEY (candidate_id, skill_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidate_skills_skill ON candidate_skills(skill_id, candidate_id)")
+    _rebuild_skill_index(cursor)
+
+def _migration_5(cursor):
+    """Table revision counter bumped by every candidates write, plus a case-insensitive name index."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS db_revision (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            value INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO db_revision (id, value) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS candidates_revision_{event.lower()} AFTER {event} ON candidates BEGIN
+                UPDATE db_revision SET value = value + 1 WHERE id = 1;
+            END
+        """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidates_name_nocase ON candidates(name COLLATE NOCASE, id)")
+
+def _migration_6(cursor):
+    """Precomputed term vectors used to rank candidates against job descriptions."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_vectors (
+            candidate_id INTEGER PRIMARY KEY REFERENCES candidates(id) ON DELETE CASCADE,
+            indices BLOB NOT NULL,
+            weights BLOB NOT NULL
+        )
+    """)
+    _rebuild_vector_index(cursor)
+
+def _migration_7(cursor):
+    """Background resume-parsing jobs (see job_queue.py), one per distinct file."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_hash TEXT NOT NULL UNIQUE,
+            filename TEXT NOT NULL,
+            pdf BLOB,
+            auto_save INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'queued'
+                CHECK (status IN ('queued', 'running', 'done', 'failed')),
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            error TEXT,
+            result TEXT,
+            candidate_id INTEGER,
+            merged INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            available_at REAL NOT NULL,
+            lease_expires_at REAL
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, available_at, id)")
+
+def _migration_8(cursor):
+    """Exact keys, MinHash signatures and LSH buckets for duplicate detection (see dedupe.py)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_keys (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+            PRIMARY KEY (kind, key, candidate_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_signatures (
+            candidate_id INTEGER PRIMARY KEY REFERENCES candidates(id) ON DELETE CASCADE,
+            signature BLOB NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_lsh (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+            PRIMARY KEY (band, bucket, candidate_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_duplicates (
+            candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+            duplicate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+            reason TEXT NOT NULL,
+            similarity REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'open' CHECK (status IN ('open', 'dismissed')),
+            PRIMARY KEY (candidate_id, duplicate_id)
+        )
+    """)
+    # Foreign-key cascades look rows up by candidate_id
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidate_keys_candidate ON candidate_keys(candidate_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidate_lsh_candidate ON candidate_lsh(candidate_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidate_duplicates_dup ON candidate_duplicates(duplicate_id)")
+    _rebuild_dedupe_index(cursor)
+
+def _migration_9(cursor):
+    """Persisted chat turns per candidate (see chat_history.py)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chat_turns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+            role TEXT NOT NULL CHECK (role IN ('user', 'assistant')),
+            content TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_turns_candidate ON chat_turns(candidate_id, id)")
+
+MIGRATIONS = [_migration_1, _migration_2, _migration_3, _migration_4, _migration_5, _migration_6,
+              _migration_7, _migration_8, _migration_9]
+
+@metrics.timed("db.init_db")
+def init_db():
+    """Initializes the database and applies any pending schema migrations (once per process)."""
+    if DB_NAME in _initialized:
+        return
+    with _init_lock:
+        if DB_NAME in _initialized:
+            return
+        with connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # readers no longer block the writer
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, migration in enumerate(MIGRATIONS, start=1):
+                if number <= version:
+                    continue
+                with transaction() as cursor:
+                    migration(cursor)
+                    cursor.execute(f"PRAGMA user_version={number}")
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_candidates_email'").fetchone():
+                # Emails were not unique when _migration_2 ran; enforce it as soon as the duplicates are merged
+                with transaction() as cursor:
+                    if _ensure_unique_email_index(cursor):
+                        cursor.execute("DROP INDEX IF EXISTS idx_candidates_email_lookup")
+        _initialized.add(DB_NAME)
+
+# --- Read-through cache ---
+# Streamlit reruns the whole script on every interaction; results of the reads
+# below are reused until a write (from any process) bumps db_revision.
+_READ_CACHE_SIZE = 256
+_read_cache = OrderedDict()
+_read_cache_lock = threading.Lock()
+
+def get_revision():
+    """Counter bumped by every insert, update or delete on candidates."""
+    with connection() as conn:
+        return conn.execute("SELECT value FROM db_revision WHERE id = 1").fetchone()[0]
+
+def _read_through(fn):
+    """Cache fn's result until the table revision changes. Cached values are shared: treat them as read-only."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (DB_NAME, fn.__name__, args, tuple(sorted(kwargs.items())))
+        revision = get_revision()
+        with _read_cache_lock:
+            cached = _read_cache.get(key)
+            if cached is not None and cached[0] == revision:
+                _read_cache.move_to_end(key)
+                return cached[1]
+        value = fn(*args, **kwargs)
+        with _read_cache_lock:
+            _read_cache[key] = (revision, value)
+            _read_cache.move_to_end(key)
+            while len(_read_cache) > _READ_CACHE_SIZE:
+                _read_cache.popitem(last=False)
+        return value
+    wrapper.uncached = fn
+    return wrapper
+
+def _candidate_row(profile_data):
+    """Flatten a profile dict into the column values stored in the candidates table."""
     # Ensure everything is a string or JSON string
     name = str(profile_data.get("name", "N/A"))
     email = str(profile_data.get("email") or "")
@@ -33,30 +392,531 @@ def add_or_update_candidate(profile_data, candidate_id=None):
     experience_json = json.dumps(profile_data.get("experience") or [])
     education_json = json.dumps(profile_data.get("education") or [])
     linkedin_json = json.dumps(profile_data.get("linkedin_profile") or "")
+    return (name, email, phone, summary, skills_json, experience_json, education_json, linkedin_json)
+
+# --- Skills index ---
+def _normalized_skills(skills):
+    """Unique (key, display) pairs for a stored skills list, split the same way parse_skills does."""
+    if isinstance(skills, str):
+        skills = [skills]
+    text = "\n".join(s for s in skills or [] if isinstance(s, str))
+    seen = {}
+    for skill in parse_skills(text):
+        normalized = normalize_skill(skill)
+        if normalized and normalized[0] not in seen:
+            seen[normalized[0]] = normalized[1]
+    return list(seen.items())
+
+def _index_skills(cursor, candidate_id, skills):
+    cursor.execute("DELETE FROM candidate_skills WHERE candidate_id=?", (candidate_id,))
+    normalized = _normalized_skills(skills)
+    if not normalized:
+        return
+    cursor.executemany("INSERT OR IGNORE INTO skills (key, display) VALUES (?, ?)", normalized)
+    cursor.executemany("""
+        INSERT OR IGNORE INTO candidate_skills (candidate_id, skill_id)
+        SELECT ?, id FROM skills WHERE key=?
+    """, [(candidate_id, key) for key, _ in normalized])
+
+def _rebuild_skill_index(cursor):
+    cursor.execute("DELETE FROM candidate_skills")
+    rows = cursor.execute("SELECT id, skills_json FROM candidates").fetchall()
+    for candidate_id, skills_json in rows:
+        _index_skills(cursor, candidate_id, safe_load_json(skills_json, []))
+    cursor.execute("DELETE FROM skills WHERE id NOT IN (SELECT skill_id FROM candidate_skills)")
+    return len(rows)
+
+@metrics.timed("db.rebuild_skill_index")
+def rebuild_skill_index():
+    """Re-derive the skills index from every candidate's skills_json; returns the candidate count."""
+    with transaction() as cursor:
+        return _rebuild_skill_index(cursor)
+
+def _skill_ids(cursor, skills):
+    """Indexed skill IDs for the given names; unknown skills map to None."""
+    ids = []
+    for skill in skills or []:
+        normalized = normalize_skill(skill)
+        row = cursor.execute("SELECT id FROM skills WHERE key=?", (normalized[0],)).fetchone() if normalized else None
+        ids.append(row[0] if row else None)
+    return ids
+
+@metrics.timed("db.find_candidates_by_skills")
+def find_candidates_by_skills(all_of=(), any_of=(), none_of=(), limit=50, offset=0):
+    """Boolean skill filter, e.g. all_of=["python", "k8s"], none_of=["php"].
+
+    Returns {"total": int, "results": [{"id", "name", "skills"}]} ordered by name.
+    """
+    with connection() as conn:
+        cursor = conn.cursor()
+        all_ids, any_ids = _skill_ids(cursor, all_of), _skill_ids(cursor, any_of)
+        none_ids = [i for i in _skill_ids(cursor, none_of) if i is not None]
+        if None in all_ids or (any_of and not any(i is not None for i in any_ids)):
+            return {"total": 0, "results": []}
+        any_ids = [i for i in any_ids if i is not None]
+
+        clauses, params = [], []
+        if all_ids:
+            marks = ",".join("?" * len(all_ids))
+            clauses.append(f"""c.id IN (SELECT candidate_id FROM candidate_skills WHERE skill_id IN ({marks})
+                                        GROUP BY candidate_id HAVING count(*) = ?)""")
+            params += all_ids + [len(set(all_ids))]
+        if any_ids:
+            clauses.append(f"c.id IN (SELECT candidate_id FROM candidate_skills WHERE skill_id IN ({','.join('?' * len(any_ids))}))")
+            params += any_ids
+        if none_ids:
+            clauses.append(f"c.id NOT IN (SELECT candidate_id FROM candidate_skills WHERE skill_id IN ({','.join('?' * len(none_ids))}))")
+            params += none_ids
+        where = " AND ".join(clauses) or "1"
+
+        total = cursor.execute(f"SELECT count(*) FROM candidates c WHERE {where}", params).fetchone()[0]
+        rows = cursor.execute(f"SELECT c.id, c.name, c.skills_json FROM candidates c WHERE {where} "
+                              f"ORDER BY c.name LIMIT ? OFFSET ?", params + [limit, offset])
+        return {"total": total, "results": [{"id": r[0], "name": r[1], "skills": safe_load_json(r[2], [])} for r in rows]}
+
+@metrics.timed("db.skill_counts")
+@_read_through
+def skill_counts(limit=100):
+    """Most common skills as [(display name, candidate count)]."""
+    with connection() as conn:
+        rows = conn.execute("""
+            SELECT s.display, count(*) AS n
+            FROM candidate_skills cs JOIN skills s ON s.id = cs.skill_id
+            GROUP BY cs.skill_id ORDER BY n DESC, s.display LIMIT ?
+        """, (limit,)).fetchall()
+    return [(r[0], r[1]) for r in rows]
+
+# --- Matching vectors ---
+def _index_vector(cursor, candidate_id, profile_data):
+    indices, weights = serialize_features(profile_features(profile_data))
+    cursor.execute(
+        "INSERT OR REPLACE INTO candidate_vectors (candidate_id, indices, weights) VALUES (?, ?, ?)",
+        (candidate_id, indices, weights),
+    )
+
+def _rebuild_vector_index(cursor):
+    rows = cursor.execute("SELECT id, summary, skills_json, experience_json FROM candidates").fetchall()
+    cursor.execute("DELETE FROM candidate_vectors")
+    for candidate_id, summary, skills_json, experience_json in rows:
+        _index_vector(cursor, candidate_id, {
+            "summary": summary,
+            "skills": safe_load_json(skills_json, []),
+            "experience": safe_load_json(experience_json, []),
+        })
+    return len(rows)
+
+@metrics.timed("db.rebuild_vector_index")
+def rebuild_vector_index():
+    """Recompute every candidate's matching vector; returns the candidate count."""
+    with transaction() as cursor:
+        return _rebuild_vector_index(cursor)
+
+# --- Duplicate detection ---
+def _index_dedupe(cursor, candidate_id, profile_data):
+    """Store exact keys, signature and LSH buckets; returns (keys, signature)."""
+    cursor.execute("DELETE FROM candidate_keys WHERE candidate_id=?", (candidate_id,))
+    cursor.execute("DELETE FROM candidate_lsh WHERE candidate_id=?", (candidate_id,))
+    keys = dedupe.exact_keys(profile_data)
+    cursor.executemany(
+        "INSERT OR IGNORE INTO candidate_keys (kind, key, candidate_id) VALUES (?, ?, ?)",
+        [(kind, key, candidate_id) for kind, key in keys],
+    )
+    signature = dedupe.minhash(profile_data)
+    if signature is None:
+        cursor.execute("DELETE FROM candidate_signatures WHERE candidate_id=?", (candidate_id,))
+    else:
+        cursor.execute(
+            "INSERT OR REPLACE INTO candidate_signatures (candidate_id, signature) VALUES (?, ?)",
+            (candidate_id, signature),
+        )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO candidate_lsh (band, bucket, candidate_id) VALUES (?, ?, ?)",
+            [(band, bucket, candidate_id) for band, bucket in dedupe.lsh_buckets(signature)],
+        )
+    return keys, signature
+
+def _find_duplicates(cursor, keys, signature, exclude_id=None, limit=5):
+    """Candidates sharing an exact key or an LSH bucket, best first, via index probes only."""
+    found = {}
+    for kind, key in keys:
+        for (candidate_id,) in cursor.execute(
+            "SELECT candidate_id FROM candidate_keys WHERE kind=? AND key=?", (kind, key)
+        ):
+            if candidate_id != exclude_id:
+                found.setdefault(candidate_id, (kind, 1.0))
 
-    with sqlite3.connect(DB_NAME, timeout=10) as conn:
+    if signature is not None:
+        buckets = dedupe.lsh_buckets(signature)
+        # OR'd equality terms become one primary-key probe per band; a row-value IN scans
+        probes = " OR ".join("(band = ? AND bucket = ?)" for _ in buckets)
+        rows = cursor.execute(f"""
+            SELECT s.candidate_id, s.signature
+            FROM candidate_signatures s
+            WHERE s.candidate_id IN (
+                SELECT candidate_id FROM candidate_lsh
+                WHERE {probes}
+                GROUP BY candidate_id ORDER BY COUNT(*) DESC LIMIT ?
+            )
+        """, [v for pair in buckets for v in pair] + [limit * 10]).fetchall()
+        for candidate_id, other in rows:
+            if candidate_id == exclude_id or candidate_id in found:
+                continue
+            score = dedupe.similarity(signature, other)
+            if score >= dedupe.DUPLICATE_THRESHOLD:
+                found[candidate_id] = ("similar", score)
+
+    ranked = sorted(found.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+    return [{"id": candidate_id, "reason": reason, "similarity": round(score, 3)}
+            for candidate_id, (reason, score) in ranked]
+
+def _flag_duplicates(cursor, candidate_id, keys, signature):
+    """Record possible duplicates of a saved candidate for review; dismissed pairs stay dismissed."""
+    for match in _find_duplicates(cursor, keys, signature, exclude_id=candidate_id):
+        pair = (min(candidate_id, match["id"]), max(candidate_id, match["id"]))
+        cursor.execute("""
+            INSERT INTO candidate_duplicates (candidate_id, duplicate_id, reason, similarity)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (candidate_id, duplicate_id) DO UPDATE
+            SET reason=excluded.reason, similarity=excluded.similarity
+        """, pair + (match["reason"], match["similarity"]))
+
+def _rebuild_dedupe_index(cursor):
+    rows = cursor.execute(f"SELECT {_PROFILE_COLUMNS} FROM candidates ORDER BY id").fetchall()
+    for table in ("candidate_keys", "candidate_signatures", "candidate_lsh"):
+        cursor.execute(f"DELETE FROM {table}")
+    for row in rows:
+        profile = _row_to_profile(row)
+        keys, signature = _index_dedupe(cursor, profile["id"], profile)
+        _flag_duplicates(cursor, profile["id"], keys, signature)
+    return len(rows)
+
+@metrics.timed("db.find_duplicates")
+def find_duplicates(profile_data, exclude_id=None, limit=5):
+    """Saved candidates that look like the same person as `profile_data`.
+
+    Returns [{"id", "name", "reason", "similarity"}], where reason is
+    "email", "phone" or "similar" (MinHash estimate of text overlap).
+    """
+    with connection() as conn:
         cursor = conn.cursor()
+        matches = _find_duplicates(cursor, dedupe.exact_keys(profile_data), dedupe.minhash(profile_data),
+                                   exclude_id=exclude_id, limit=limit)
+        names = dict(cursor.execute(
+            f"SELECT id, name FROM candidates WHERE id IN ({','.join('?' * len(matches))})",
+            [m["id"] for m in matches],
+        ).fetchall()) if matches else {}
+        return [dict(m, name=names.get(m["id"], "")) for m in matches if m["id"] in names]
+
+@metrics.timed("db.list_possible_duplicates")
+def list_possible_duplicates(limit=20):
+    """Open duplicate pairs flagged at save time, most similar first."""
+    with connection() as conn:
+        rows = conn.execute("""
+            SELECT d.candidate_id, a.name, d.duplicate_id, b.name, d.reason, d.similarity
+            FROM candidate_duplicates d
+            JOIN candidates a ON a.id = d.candidate_id
+            JOIN candidates b ON b.id = d.duplicate_id
+            WHERE d.status = 'open'
+            ORDER BY d.similarity DESC, d.duplicate_id DESC
+            LIMIT ?
+        """, (limit,)).fetchall()
+    return [{"id": r[0], "name": r[1], "duplicate_id": r[2], "duplicate_name": r[3],
+             "reason": r[4], "similarity": r[5]} for r in rows]
+
+@metrics.timed("db.dismiss_duplicate")
+def dismiss_duplicate(candidate_id, duplicate_id):
+    """Mark a flagged pair as two different people."""
+    pair = (min(candidate_id, duplicate_id), max(candidate_id, duplicate_id))
+    with transaction() as cursor:
+        cursor.execute(
+            "UPDATE candidate_duplicates SET status='dismissed' WHERE candidate_id=? AND duplicate_id=?", pair
+        )
+
+@metrics.timed("db.merge_candidates")
+def merge_candidates(keep_id, drop_id, profile_data=None):
+    """Merge `drop_id` into `keep_id` and delete it, keeping its chat history; returns keep_id.
+
+    `profile_data`, when given, is merged in first (e.g. a new upload that
+    matched `keep_id`). Scalar fields prefer the earlier source, except that
+    the kept row's email stays when it has one or when the incoming email
+    belongs to another candidate; any other email is noted in the summary so
+    it isn't lost. Skills, experience and education are unioned without
+    repeats.
+    """
+    with transaction() as cursor:
+        kept, dropped = (
+            _row_to_profile(cursor.execute(f"SELECT {_PROFILE_COLUMNS} FROM candidates WHERE id=?", (candidate_id,)).fetchone())
+            for candidate_id in (keep_id, drop_id)
+        )
+        merged = merge_profiles([p for p in (profile_data, kept, dropped) if p])
+        if kept and (kept["email"] or _find_by_email(cursor, merged["email"]) not in (None, keep_id, drop_id)):
+            merged["email"] = kept["email"]
+        other_emails = []
+        for source in (profile_data, kept, dropped):
+            email = str((source or {}).get("email") or "").strip()
+            if email and email.lower() not in (merged["email"] + " " + merged["summary"] + " " + " ".join(other_emails)).lower():
+                other_emails.append(email)
+        if other_emails:
+            merged["summary"] = (merged["summary"] + "\n\n" if merged["summary"] else "") + \
+                "Other email: " + ", ".join(other_emails)
+        if drop_id and drop_id != keep_id:
+            cursor.execute("UPDATE chat_turns SET candidate_id=? WHERE candidate_id=?", (keep_id, drop_id))
+            # Free the email first so the unique index allows it on the kept row
+            cursor.execute("DELETE FROM candidates WHERE id=?", (drop_id,))
+        _insert_or_update(cursor, merged, keep_id)
+    _notify_change([keep_id] + ([drop_id] if drop_id else []))
+    return keep_id
+
+def _find_by_email(cursor, email):
+    if not email:
+        return None
+    row = cursor.execute(
+        "SELECT id FROM candidates WHERE lower(email)=lower(?) AND email <> ''", (email,)
+    ).fetchone()
+    return row[0] if row else None
+
+def _insert_or_update(cursor, profile_data, candidate_id=None):
+    """Write one candidate and return (its ID, whether it was merged into an existing one).
+
+    A profile saved without an ID whose email is already stored is merged
+    into that candidate with merge_profiles: the stored name and contact
+    details win and skills, experience and education are unioned, so nothing
+    already saved is lost.
+    """
+    merged = False
+    if not candidate_id:
+        candidate_id = _find_by_email(cursor, _candidate_row(profile_data)[1])
         if candidate_id:
-            # Update by id
-            cursor.execute("""
-                UPDATE candidates
-                SET name=?, email=?, phone=?, summary=?, skills_json=?, experience_json=?, education_json=?, linkedin_json=?
-                WHERE id=?
-            """, (name, email, phone, summary, skills_json, experience_json, education_json, linkedin_json, candidate_id))
-        else:
-            # Insert new
-            cursor.execute("""
-                INSERT INTO candidates (name, email, phone, summary, skills_json, experience_json, education_json, linkedin_json)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (name, email, phone, summary, skills_json, experience_json, education_json, linkedin_json))
-        conn.commit()
+            stored = cursor.execute(f"SELECT {_PROFILE_COLUMNS} FROM candidates WHERE id=?", (candidate_id,)).fetchone()
+            profile_data = merge_profiles([_row_to_profile(stored), profile_data])
+            merged = True
+            metrics.inc("candidate_email_merges")
+    row = _candidate_row(profile_data)
+    if candidate_id:
+        # Update by id
+        cursor.execute("""
+            UPDATE candidates
+            SET name=?, email=?, phone=?, summary=?, skills_json=?, experience_json=?, education_json=?, linkedin_json=?,
+                revision=revision+1
+            WHERE id=?
+        """, row + (candidate_id,))
+    else:
+        # Insert new
+        cursor.execute("""
+            INSERT INTO candidates (name, email, phone, summary, skills_json, experience_json, education_json, linkedin_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, row)
+        candidate_id = cursor.lastrowid
+    _index_skills(cursor, candidate_id, profile_data.get("skills"))
+    _index_vector(cursor, candidate_id, profile_data)
+    keys, signature = _index_dedupe(cursor, candidate_id, profile_data)
+    _flag_duplicates(cursor, candidate_id, keys, signature)
+    return candidate_id, merged
+
+@metrics.timed("db.add_or_update_candidate")
+def add_or_update_candidate(profile_data, candidate_id=None):
+    """Adds a new candidate or updates an existing one by ID and returns its ID.
+
+    Without an ID, a profile whose email is already stored is merged into
+    that candidate instead of replacing it.
+    """
+    with transaction() as cursor:
+        candidate_id, _ = _insert_or_update(cursor, profile_data, candidate_id)
+    _notify_change([candidate_id])
+    return candidate_id
+
+@metrics.timed("db.add_candidates_bulk")
+def add_candidates_bulk(profiles):
+    """Saves many candidates in a single transaction.
+
+    Returns [(candidate_id, merged)] in order; `merged` is True when the
+    profile's email was already stored and it was merged into that candidate.
+    """
+    with transaction() as cursor:
+        saved = [_insert_or_update(cursor, profile) for profile in profiles]
+    _notify_change([candidate_id for candidate_id, _ in saved])
+    return saved
+
+def _index_many(cursor, items, replace=()):
+    """Skill, vector and duplicate indexes for many saved candidates at once.
+
+    `items` is [(candidate_id, profile)]; `replace` holds the IDs whose old
+    index rows must be removed first. Returns [(candidate_id, keys, signature)].
+    """
+    stale = [(candidate_id,) for candidate_id in replace]
+    for table in ("candidate_skills", "candidate_keys", "candidate_signatures", "candidate_lsh"):
+        cursor.executemany(f"DELETE FROM {table} WHERE candidate_id=?", stale)
+
+    skill_rows, vector_rows, key_rows, signature_rows, lsh_rows, indexed = [], [], [], [], [], []
+    for candidate_id, profile in items:
+        skill_rows += [(candidate_id, key, display) for key, display in _normalized_skills(profile.get("skills"))]
+        vector_rows.append((candidate_id,) + serialize_features(profile_features(profile)))
+        keys = dedupe.exact_keys(profile)
+        key_rows += [(kind, key, candidate_id) for kind, key in keys]
+        signature = dedupe.minhash(profile)
+        if signature is not None:
+            signature_rows.append((candidate_id, signature))
+            lsh_rows += [(band, bucket, candidate_id) for band, bucket in dedupe.lsh_buckets(signature)]
+        indexed.append((candidate_id, keys, signature))
+
+    cursor.executemany("INSERT OR IGNORE INTO skills (key, display) VALUES (?, ?)",
+                       [(key, display) for _, key, display in skill_rows])
+    cursor.executemany("""
+        INSERT OR IGNORE INTO candidate_skills (candidate_id, skill_id)
+        SELECT ?, id FROM skills WHERE key=?
+    """, [(candidate_id, key) for candidate_id, key, _ in skill_rows])
+    cursor.executemany(
+        "INSERT OR REPLACE INTO candidate_vectors (candidate_id, indices, weights) VALUES (?, ?, ?)", vector_rows
+    )
+    cursor.executemany("INSERT OR IGNORE INTO candidate_keys (kind, key, candidate_id) VALUES (?, ?, ?)", key_rows)
+    cursor.executemany(
+        "INSERT OR REPLACE INTO candidate_signatures (candidate_id, signature) VALUES (?, ?)", signature_rows
+    )
+    cursor.executemany("INSERT OR IGNORE INTO candidate_lsh (band, bucket, candidate_id) VALUES (?, ?, ?)", lsh_rows)
+    return indexed
+
+@metrics.timed("db.import_candidates_batch")
+def import_candidates_batch(profiles, on_conflict="update", flag_duplicates=True):
+    """Save a batch of profiles in one transaction with executemany.
 
+    A profile that matches a stored candidate, or an earlier profile in the
+    same batch, is a conflict: on_conflict="update" overwrites it and "skip"
+    keeps what is there. Profiles match on email; one without an email
+    matches on its exported "id" (same name, no stored email) or else on its
+    normalized phone number, so restoring a backup twice is idempotent. New
+    rows keep their exported ID when it is still free.
+    Skill, vector and duplicate indexes are maintained here and the FTS index
+    by its triggers. Returns {"inserted", "updated", "skipped"}.
+    """
+    if on_conflict not in ("update", "skip"):
+        raise ValueError(f"on_conflict must be 'update' or 'skip', not {on_conflict!r}")
+
+    def match_keys(profile):
+        email = str(profile.get("email") or "").lower()
+        if email:
+            return [("email", email)]
+        keys = []
+        if isinstance(profile.get("id"), int):
+            # An exported ID only identifies the same candidate while it has the same name
+            keys.append(("id", (profile["id"], str(profile.get("name") or "").lower())))
+        phone = dedupe.normalize_phone(profile.get("phone"))
+        if phone:
+            keys.append(("phone", phone))
+        return keys
+
+    def lookup(sql, values):
+        values, rows = sorted(values), []
+        for i in range(0, len(values), 500):
+            chunk = values[i:i + 500]
+            rows += cursor.execute(sql.format(params=",".join("?" * len(chunk))), chunk).fetchall()
+        return rows
+
+    with transaction() as cursor:
+        wanted = {}
+        for profile in profiles:
+            for kind, key in match_keys(profile):
+                wanted.setdefault(kind, set()).add(key)
+        existing = {("email", key): candidate_id for key, candidate_id in lookup(
+            "SELECT lower(email), id FROM candidates WHERE email <> '' AND lower(email) IN ({params})",
+            wanted.get("email", ()),
+        )}
+        exported_ids = {p["id"] for p in profiles if isinstance(p.get("id"), int)}
+        taken_ids = set()
+        for candidate_id, name, email in lookup(
+            "SELECT id, lower(name), email FROM candidates WHERE id IN ({params})", exported_ids,
+        ):
+            taken_ids.add(candidate_id)
+            if email == "":
+                existing[("id", (candidate_id, name))] = candidate_id
+        existing.update((("phone", key), candidate_id) for key, candidate_id in lookup("""
+            SELECT k.key, MIN(k.candidate_id) FROM candidate_keys k JOIN candidates c ON c.id = k.candidate_id
+            WHERE k.kind = 'phone' AND c.email = '' AND k.key IN ({params})
+            GROUP BY k.key
+        """, wanted.get("phone", ())))
+
+        updates, inserts, new_by_key, skipped = {}, [], {}, 0
+        for profile in profiles:
+            keys = match_keys(profile)
+            target = next((existing[k] for k in keys if k in existing), None)
+            pending = next((new_by_key[k] for k in keys if k in new_by_key), None)
+            if target is not None or pending is not None:
+                if on_conflict == "skip":
+                    skipped += 1
+                elif target is not None:
+                    updates[target] = profile
+                else:
+                    inserts[pending] = profile  # the later row wins
+                continue
+            for key in keys:
+                new_by_key[key] = len(inserts)
+            inserts.append(profile)
+
+        cursor.executemany("""
+            UPDATE candidates
+            SET name=?, email=?, phone=?, summary=?, skills_json=?, experience_json=?, education_json=?, linkedin_json=?,
+                revision=revision+1
+            WHERE id=?
+        """, [_candidate_row(p) + (candidate_id,) for candidate_id, p in updates.items()])
+
+        # Restored rows keep their exported ID when no stored candidate has it; the rest get new IDs
+        keep, renumber = {}, []
+        for profile in inserts:
+            candidate_id = profile.get("id")
+            if isinstance(candidate_id, int) and candidate_id > 0 and candidate_id not in taken_ids \
+                    and candidate_id not in keep:
+                keep[candidate_id] = profile
+            else:
+                renumber.append(profile)
+        cursor.executemany("""
+            INSERT INTO candidates (id, name, email, phone, summary, skills_json, experience_json, education_json, linkedin_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(candidate_id,) + _candidate_row(p) for candidate_id, p in keep.items()])
+        last_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM candidates").fetchone()[0]
+        cursor.executemany("""
+            INSERT INTO candidates (name, email, phone, summary, skills_json, experience_json, education_json, linkedin_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [_candidate_row(p) for p in renumber])
+        # We hold the write lock, so the new rows are exactly the IDs above the old maximum, in insert order
+        new_ids = [row[0] for row in cursor.execute("SELECT id FROM candidates WHERE id > ? ORDER BY id", (last_id,))]
+
+        items = list(updates.items()) + list(keep.items()) + list(zip(new_ids, renumber))
+        indexed = _index_many(cursor, items, replace=list(updates))
+        if flag_duplicates:
+            for candidate_id, keys, signature in indexed:
+                _flag_duplicates(cursor, candidate_id, keys, signature)
+
+    _notify_change([candidate_id for candidate_id, _ in items])
+    return {"inserted": len(keep) + len(new_ids), "updated": len(updates), "skipped": skipped}
+
+@metrics.timed("db.get_all_candidate_names")
 def get_all_candidate_names():
     """Get all candidate names."""
-    with sqlite3.connect(DB_NAME, timeout=10) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM candidates ORDER BY name")
-        return [row[0] for row in cursor.fetchall()]
+    with connection() as conn:
+        return [row[0] for row in conn.execute("SELECT name FROM candidates ORDER BY name")]
+
+@metrics.timed("db.list_candidate_names")
+@_read_through
+def list_candidate_names(prefix="", after=None, limit=50):
+    """One page of candidates ordered by name (case-insensitive), as [{"id", "name"}].
+
+    `prefix` narrows to names starting with it (typeahead); pass the last
+    (name, id) of a page as `after` to fetch the next one. Both use the
+    name index, so cost depends on the page size, not the table size.
+    """
+    clauses, params = [], []
+    if prefix:
+        clauses.append("name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE")
+        params += [prefix, prefix + "\U0010ffff"]
+    if after:
+        clauses.append("(name COLLATE NOCASE, id) > (?, ?)")
+        params += list(after)
+    where = " AND ".join(clauses) or "1"
+    with connection() as conn:
+        rows = conn.execute(
+            f"SELECT id, name FROM candidates WHERE {where} ORDER BY name COLLATE NOCASE, id LIMIT ?",
+            params + [limit],
+        ).fetchall()
+    return [{"id": r[0], "name": r[1]} for r in rows]
 
 def safe_load_json(value, default):
     """Safely load JSON from database, always returning a consistent type."""
@@ -72,13 +932,41 @@ def safe_load_json(value, default):
     except Exception:
         return default
 
+_PROFILE_COLUMNS = "id, name, email, phone, summary, skills_json, experience_json, education_json, linkedin_json, revision"
+
+@metrics.timed("db.get_candidate_by_name")
+@_read_through
 def get_candidate_by_name(name):
     """Get full profile for a candidate by name."""
-    with sqlite3.connect(DB_NAME, timeout=10) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM candidates WHERE name=?", (name,))
-        row = cursor.fetchone()
+    with connection() as conn:
+        row = conn.execute(f"SELECT {_PROFILE_COLUMNS} FROM candidates WHERE name=?", (name,)).fetchone()
+    return _row_to_profile(row)
 
+@metrics.timed("db.get_candidate_by_id")
+@_read_through
+def get_candidate_by_id(candidate_id):
+    """Get full profile for a candidate by ID."""
+    with connection() as conn:
+        row = conn.execute(f"SELECT {_PROFILE_COLUMNS} FROM candidates WHERE id=?", (candidate_id,)).fetchone()
+    return _row_to_profile(row)
+
+@metrics.timed("db.iter_candidates")
+def iter_candidates(batch_size=500):
+    """Yield every full profile in ID order, reading `batch_size` rows at a time."""
+    last_id = 0
+    while True:
+        # One checkout per batch, so a slow consumer doesn't hold a pooled connection
+        with connection() as conn:
+            rows = conn.execute(
+                f"SELECT {_PROFILE_COLUMNS} FROM candidates WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+            ).fetchall()
+        for row in rows:
+            yield _row_to_profile(row)
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1][0]
+
+def _row_to_profile(row):
     if not row:
         return None
 
@@ -91,19 +979,78 @@ def get_candidate_by_name(name):
         "skills": safe_load_json(row[5], []),
         "experience": safe_load_json(row[6], []),
         "education": safe_load_json(row[7], []),
-        "linkedin_profile": safe_load_json(row[8], "")
+        "linkedin_profile": safe_load_json(row[8], ""),
+        "revision": row[9],
     }
 
+# --- Search ---
+def _has_fts(conn):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='candidates_fts'"
+    ).fetchone()
+    return row is not None
+
+def _quote_fts_query(query):
+    """Treat every word as a literal term, for input that isn't valid FTS5 syntax (e.g. "c++")."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+@metrics.timed("db.search_candidates")
+@_read_through
+def search_candidates(query, limit=20, offset=0):
+    """Full-text search over candidate profiles, ranked by BM25.
+
+    Supports FTS5 syntax such as `kafka AND fintech`, `"machine learning"`
+    or `data*`. Returns {"total": int, "results": [{"id", "name", "snippet", "score"}]}.
+    """
+    query = (query or "").strip()
+    if not query:
+        return {"total": 0, "results": []}
+
+    with connection() as conn:
+        if not _has_fts(conn):
+            like = f"%{query}%"
+            where = "name LIKE ? OR summary LIKE ? OR skills_json LIKE ? OR experience_json LIKE ? OR education_json LIKE ?"
+            total = conn.execute(f"SELECT count(*) FROM candidates WHERE {where}", (like,) * 5).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT id, name, summary FROM candidates WHERE {where} ORDER BY name LIMIT ? OFFSET ?",
+                (like,) * 5 + (limit, offset),
+            )
+            return {"total": total, "results": [
+                {"id": r[0], "name": r[1], "snippet": (r[2] or "")[:120], "score": 0.0} for r in rows
+            ]}
+
+        # Column weights: name, summary, skills, experience, education
+        sql = """
+            SELECT rowid, name, snippet(candidates_fts, -1, '**', '**', '…', 12),
+                   bm25(candidates_fts, 10.0, 2.0, 5.0, 3.0, 1.0) AS score
+            FROM candidates_fts WHERE candidates_fts MATCH ?
+            ORDER BY score LIMIT ? OFFSET ?
+        """
+        for match in (query, _quote_fts_query(query)):
+            try:
+                total = conn.execute("SELECT count(*) FROM candidates_fts WHERE candidates_fts MATCH ?", (match,)).fetchone()[0]
+                rows = conn.execute(sql, (match, limit, offset)).fetchall()
+                break
+            except sqlite3.OperationalError:
+                continue
+        else:
+            return {"total": 0, "results": []}
+
+        return {"total": total, "results": [
+            {"id": r[0], "name": r[1], "snippet": r[2], "score": -r[3]} for r in rows
+        ]}
+
+@metrics.timed("db.delete_candidate_by_id")
 def delete_candidate_by_id(candidate_id):
     """Delete candidate by ID."""
-    with sqlite3.connect(DB_NAME, timeout=10) as conn:
-        cursor = conn.cursor()
+    with transaction() as cursor:
         cursor.execute("DELETE FROM candidates WHERE id=?", (candidate_id,))
-        conn.commit()
+    _notify_change([candidate_id])
 
+@metrics.timed("db.delete_candidate_by_name")
 def delete_candidate_by_name(name):
     """Delete candidate by name (legacy)."""
-    with sqlite3.connect(DB_NAME, timeout=10) as conn:
-        cursor = conn.cursor()
+    with transaction() as cursor:
+        ids = [row[0] for row in cursor.execute("SELECT id FROM candidates WHERE name=?", (name,))]
         cursor.execute("DELETE FROM candidates WHERE name=?", (name,))
-        conn.commit()
+    _notify_change(ids)
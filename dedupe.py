@@ -0,0 +1,124 @@
+"""Near-duplicate candidate detection.
+
+Two kinds of evidence are indexed for every saved profile (see database.py):
+
+- exact keys: the normalized email (lower-cased, "+tag" dropped, Gmail dots
+  ignored) and phone number (digits only, last 10 kept)
+- a MinHash signature over word 3-gram shingles of the profile text, split
+  into LSH bands so that similar profiles share at least one band bucket
+
+Looking a profile up is a handful of indexed equality probes, never a scan
+over all candidates. With 16 bands of 4 rows, pairs above ~0.5 Jaccard
+similarity are found with high probability.
+"""
+import re
+import zlib
+import hashlib
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+DUPLICATE_THRESHOLD = 0.5   # estimated Jaccard similarity flagged as a possible duplicate
+
+_PRIME = (1 << 31) - 1
+_MASK = (1 << 31) - 1
+
+
+def _permutations():
+    import numpy as np
+
+    rng = np.random.RandomState(20240611)  # fixed: signatures must stay comparable across runs
+    a = rng.randint(1, _PRIME, size=NUM_PERM).astype(np.uint64)
+    b = rng.randint(0, _PRIME, size=NUM_PERM).astype(np.uint64)
+    return a, b
+
+
+_perms = None
+
+
+def normalize_email(email):
+    email = (email or "").strip().lower()
+    if "@" not in email:
+        return ""
+    local, _, domain = email.rpartition("@")
+    local = local.split("+", 1)[0]
+    if domain in ("gmail.com", "googlemail.com"):
+        local, domain = local.replace(".", ""), "gmail.com"
+    return f"{local}@{domain}" if local else ""
+
+
+def normalize_phone(phone):
+    digits = re.sub(r"\D", "", phone or "")
+    if len(digits) < 7:
+        return ""
+    return digits[-10:]  # drop country codes / trunk prefixes
+
+
+def exact_keys(profile):
+    """[(kind, key)] for the profile's normalized email and phone."""
+    keys = []
+    email = normalize_email(profile.get("email"))
+    if email:
+        keys.append(("email", email))
+    phone = normalize_phone(profile.get("phone"))
+    if phone:
+        keys.append(("phone", phone))
+    return keys
+
+
+def profile_text(profile):
+    parts = [profile.get("name") or "", profile.get("summary") or ""]
+    skills = profile.get("skills") or []
+    parts.append(" ".join(skills) if isinstance(skills, list) else str(skills))
+    for exp in profile.get("experience") or []:
+        if isinstance(exp, dict):
+            parts += [str(exp.get(k) or "") for k in ("title", "company", "duration", "description")]
+    for edu in profile.get("education") or []:
+        if isinstance(edu, dict):
+            parts += [str(edu.get(k) or "") for k in ("degree", "institution", "year")]
+    return " ".join(parts)
+
+
+def shingles(text, size=3):
+    """Hashed word n-gram shingles (unigrams for very short texts)."""
+    words = re.findall(r"[a-z0-9+#]+", (text or "").lower())
+    if len(words) < size:
+        grams = words
+    else:
+        grams = (" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+    return {zlib.crc32(g.encode("utf-8")) & _MASK for g in grams}
+
+
+def minhash(profile):
+    """MinHash signature (NUM_PERM uint32 values as bytes), or None for an empty profile."""
+    import numpy as np
+    global _perms
+
+    hashed = shingles(profile_text(profile))
+    if not hashed:
+        return None
+    if _perms is None:
+        _perms = _permutations()
+    a, b = _perms
+    x = np.fromiter(hashed, dtype=np.uint64, count=len(hashed))
+    signature = ((np.outer(a, x) + b[:, None]) % _PRIME).min(axis=1)
+    return signature.astype(np.uint32).tobytes()
+
+
+def lsh_buckets(signature):
+    """[(band, bucket)] for a signature; equal buckets mean a candidate pair."""
+    width = ROWS * 4
+    return [
+        (band, int.from_bytes(hashlib.blake2b(signature[band * width:(band + 1) * width], digest_size=8).digest(),
+                              "big", signed=True))
+        for band in range(BANDS)
+    ]
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    import numpy as np
+
+    a = np.frombuffer(sig_a, dtype=np.uint32)
+    b = np.frombuffer(sig_b, dtype=np.uint32)
+    return float((a == b).mean())
@@ -0,0 +1,154 @@
+"""Persistent, content-addressed cache for PDF text and LLM-extracted profiles.
+
+Two lookups back the resume pipeline:
+
+- file hash (sha256 of the PDF bytes) + page limit -> extracted page texts, skipping PyPDF2
+- profile key (model, prompt version and normalized text) -> profile JSON,
+  skipping the Groq call. Re-saved PDFs that only differ in metadata hash
+  differently but still land on the same profile key.
+
+Entries are evicted least-recently-used first once the cache grows past
+EXTRACTION_CACHE_MAX_MB (set it to 0 to disable caching).
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+CACHE_DB = os.getenv("EXTRACTION_CACHE_DB", "extraction_cache.db")
+CACHE_MAX_BYTES = int(float(os.getenv("EXTRACTION_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _connect():
+    global _initialized
+    conn = sqlite3.connect(CACHE_DB, timeout=10)
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS pdf_text (
+                        file_hash TEXT PRIMARY KEY,
+                        text TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        last_access REAL NOT NULL
+                    );
+                    CREATE TABLE IF NOT EXISTS profiles (
+                        cache_key TEXT PRIMARY KEY,
+                        profile_json TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        last_access REAL NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_pdf_text_access ON pdf_text(last_access);
+                    CREATE INDEX IF NOT EXISTS idx_profiles_access ON profiles(last_access);
+                """)
+                _initialized = True
+    return conn
+
+
+def enabled():
+    return CACHE_MAX_BYTES > 0
+
+
+def file_hash(pdf_bytes: bytes) -> str:
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so layout-only differences share one cache entry."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def profile_key(resume_text: str, model_name: str, prompt_version: str) -> str:
+    h = hashlib.sha256()
+    for part in (model_name, prompt_version, normalize_text(resume_text)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _get(table, key_column, value_column, key):
+    if not enabled():
+        return None
+    try:
+        with _connect() as conn:
+            row = conn.execute(f"SELECT {value_column} FROM {table} WHERE {key_column}=?", (key,)).fetchone()
+            if row:
+                conn.execute(f"UPDATE {table} SET last_access=? WHERE {key_column}=?", (time.time(), key))
+        return row[0] if row else None
+    except sqlite3.Error as e:
+        print(f"Extraction cache read failed: {e}")
+        return None
+
+
+def _put(table, key_column, value_column, key, value):
+    if not enabled():
+        return
+    size = len(value.encode("utf-8"))
+    if size > CACHE_MAX_BYTES:
+        return
+    try:
+        with _connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table} ({key_column}, {value_column}, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            _evict(conn)
+    except sqlite3.Error as e:
+        print(f"Extraction cache write failed: {e}")
+
+
+def _evict(conn):
+    """Drop least-recently-used entries until the cache fits in CACHE_MAX_BYTES."""
+    total = conn.execute(
+        "SELECT (SELECT COALESCE(SUM(size), 0) FROM pdf_text) + (SELECT COALESCE(SUM(size), 0) FROM profiles)"
+    ).fetchone()[0]
+    if total <= CACHE_MAX_BYTES:
+        return
+    # Evict down to 90% so we don't pay this on every subsequent write
+    target = total - int(CACHE_MAX_BYTES * 0.9)
+    rows = conn.execute("""
+        SELECT 'pdf_text', file_hash, size, last_access FROM pdf_text
+        UNION ALL
+        SELECT 'profiles', cache_key, size, last_access FROM profiles
+        ORDER BY last_access
+    """)
+    victims = []
+    for table, key, size, _ in rows:
+        victims.append((table, key))
+        target -= size
+        if target <= 0:
+            break
+    for table, key in victims:
+        key_column = "file_hash" if table == "pdf_text" else "cache_key"
+        conn.execute(f"DELETE FROM {table} WHERE {key_column}=?", (key,))
+
+
+def get_text(pdf_hash):
+    return _get("pdf_text", "file_hash", "text", pdf_hash)
+
+
+def put_text(pdf_hash, text):
+    _put("pdf_text", "file_hash", "text", pdf_hash, text)
+
+
+def get_profile(key):
+    cached = _get("profiles", "cache_key", "profile_json", key)
+    return json.loads(cached) if cached else None
+
+
+def put_profile(key, profile):
+    _put("profiles", "cache_key", "profile_json", key, json.dumps(profile))
+
+
+def clear():
+    """Remove every cached entry."""
+    with _connect() as conn:
+        conn.execute("DELETE FROM pdf_text")
+        conn.execute("DELETE FROM profiles")
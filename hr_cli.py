@@ -0,0 +1,203 @@
+"""Headless command-line interface for scripts, cron jobs and pipelines.
+
+    python hr_cli.py ingest resumes.zip            # parse and save now
+    python hr_cli.py ingest resumes/ --queue       # hand off to worker.py
+    python hr_cli.py search "kafka AND fintech" --json
+    python hr_cli.py export --output candidates.jsonl
+    python hr_cli.py import candidates.csv --on-conflict skip
+    python hr_cli.py ask "Jane Doe" "Does she know Kubernetes?"
+    python hr_cli.py ask-many "Who has led a team?" --search kafka
+
+Only argparse is imported up front; each subcommand imports the modules it
+needs, so search and export never load the LLM client, PyPDF2 or Streamlit.
+"""
+import sys
+import json
+import logging
+import argparse
+
+
+def _print_json(value):
+    sys.stdout.write(json.dumps(value, ensure_ascii=False) + "\n")
+
+
+def cmd_ingest(args):
+    if args.queue:
+        from database import init_db
+        from bulk_ingest import iter_resume_files
+        from job_queue import enqueue
+
+        init_db()
+        job_ids = [enqueue(filename, pdf_bytes, auto_save=True) for filename, pdf_bytes in iter_resume_files(args.source)]
+        print(f"Queued {len(job_ids)} resumes; run `python worker.py` to process them.")
+        return 0
+
+    from bulk_ingest import main as bulk_main
+    return bulk_main([args.source, "--llm-concurrency", str(args.llm_concurrency)])
+
+
+def cmd_search(args):
+    from database import init_db, search_candidates, find_candidates_by_skills
+
+    init_db()
+    if args.skills:
+        found = find_candidates_by_skills(all_of=[s.strip() for s in args.skills.split(",") if s.strip()],
+                                          limit=args.limit, offset=args.offset)
+    else:
+        found = search_candidates(args.query or "", limit=args.limit, offset=args.offset)
+    if args.json:
+        _print_json(found)
+        return 0
+    for hit in found["results"]:
+        snippet = hit.get("snippet") or ", ".join(hit.get("skills", [])[:8])
+        print(f"{hit['id']}\t{hit['name']}\t{snippet}")
+    print(f"{found['total']} match(es)", file=sys.stderr)
+    return 0
+
+
+def cmd_export(args):
+    from database import init_db
+    from transfer import export_candidates, guess_format
+
+    init_db()
+    fmt = args.format or guess_format(args.output)
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        count = export_candidates(out, fmt)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Exported {count} candidates.", file=sys.stderr)
+    return 0
+
+
+def cmd_import(args):
+    from database import init_db
+    from transfer import import_candidates, guess_format
+
+    init_db()
+    fmt = args.format or guess_format(args.source)
+    src = open(args.source, encoding="utf-8", newline="") if args.source != "-" else sys.stdin
+    try:
+        totals = import_candidates(src, fmt, on_conflict=args.on_conflict, batch_size=args.batch_size,
+                                   flag_duplicates=not args.no_duplicate_check)
+    except ValueError as e:
+        print(f"import: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    print(f"Imported {totals['inserted']} new, updated {totals['updated']}, skipped {totals['skipped']}.",
+          file=sys.stderr)
+    return 0
+
+
+def cmd_ask(args):
+    from database import init_db, get_candidate_by_id, get_candidate_by_name
+
+    init_db()
+    candidate = get_candidate_by_id(int(args.candidate)) if args.candidate.isdigit() else None
+    candidate = candidate or get_candidate_by_name(args.candidate)
+    if not candidate:
+        print(f"No candidate named or numbered {args.candidate!r}.", file=sys.stderr)
+        return 1
+
+    from data_extractor import stream_chatbot_response
+
+    for chunk in stream_chatbot_response(args.question, candidate):
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+    sys.stdout.write("\n")
+    return 0
+
+
+def cmd_ask_many(args):
+    from database import init_db, get_candidate_by_id, search_candidates
+
+    init_db()
+    ids = [int(i) for i in args.ids.split(",") if i.strip().isdigit()] if args.ids else []
+    if args.search:
+        ids += [hit["id"] for hit in search_candidates(args.search, limit=args.limit)["results"]]
+    profiles = [get_candidate_by_id(i) for i in dict.fromkeys(ids)]
+    if not any(profiles):
+        print("No candidates to ask; give --ids or a --search that matches.", file=sys.stderr)
+        return 1
+
+    from multi_chat import narrow_candidates, iter_answers, stream_synthesis
+
+    asked, skipped = narrow_candidates(args.question, profiles)
+    if skipped:
+        print(f"Skipped {len(skipped)} weaker matches: {', '.join(p['name'] for p in skipped)}", file=sys.stderr)
+    answers = []
+    for result in iter_answers(args.question, asked):
+        answers.append(result)
+        print(f"## {result['name']} (#{result['id']}, {result['seconds']}s)\n{result['answer']}\n")
+    if len(answers) > 1:
+        print("## Across the shortlist")
+        for chunk in stream_synthesis(args.question, answers):
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+        sys.stdout.write("\n")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="hr_cli.py", description="AI HR Assistant without the web UI.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log prompt sizes and LLM token usage to stderr")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="parse and save every PDF in a folder or zip archive")
+    ingest.add_argument("source", help="directory or .zip of PDF resumes")
+    ingest.add_argument("--llm-concurrency", type=int, default=4)
+    ingest.add_argument("--queue", action="store_true", help="queue for worker.py instead of parsing now")
+    ingest.set_defaults(func=cmd_ingest)
+
+    search = sub.add_parser("search", help="full-text or skill search")
+    search.add_argument("query", nargs="?", help="full-text query (supports AND/OR/NOT and \"phrases\")")
+    search.add_argument("--skills", help="comma-separated skills the candidate must all have")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--offset", type=int, default=0)
+    search.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    search.set_defaults(func=cmd_search)
+
+    export = sub.add_parser("export", help="write every candidate as JSON lines or CSV")
+    export.add_argument("--output", help="file to write (default: stdout)")
+    export.add_argument("--format", choices=("jsonl", "csv"), help="default: from the file extension, else jsonl")
+    export.set_defaults(func=cmd_export)
+
+    load = sub.add_parser("import", help="load candidates from a JSON lines or CSV export")
+    load.add_argument("source", help="file to read, or - for stdin")
+    load.add_argument("--format", choices=("jsonl", "csv"), help="default: from the file extension, else jsonl")
+    load.add_argument("--on-conflict", choices=("update", "skip"), default="update",
+                      help="what to do with a candidate whose email is already stored")
+    load.add_argument("--batch-size", type=int, default=1000, help="profiles per transaction")
+    load.add_argument("--no-duplicate-check", action="store_true",
+                      help="skip flagging possible duplicates (faster for trusted backups)")
+    load.set_defaults(func=cmd_import)
+
+    ask = sub.add_parser("ask", help="ask one question about a candidate")
+    ask.add_argument("candidate", help="candidate ID or exact name")
+    ask.add_argument("question")
+    ask.set_defaults(func=cmd_ask)
+
+    ask_many = sub.add_parser("ask-many", help="ask one question across several candidates at once")
+    ask_many.add_argument("question")
+    ask_many.add_argument("--ids", help="comma-separated candidate IDs")
+    ask_many.add_argument("--search", help="also shortlist the full-text search hits for this query")
+    ask_many.add_argument("--limit", type=int, default=20, help="search hits to shortlist")
+    ask_many.set_defaults(func=cmd_ask_many)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.command == "search" and not (args.query or args.skills):
+        print("search: give a query or --skills", file=sys.stderr)
+        return 2
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
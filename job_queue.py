@@ -0,0 +1,207 @@
+"""SQLite-backed queue of resume-parsing jobs.
+
+The UI enqueues uploaded PDFs and polls their status; one or more worker
+processes (worker.py) claim jobs, run extraction and store the result.
+Jobs move through queued -> running -> done | failed. A job that fails is
+retried with exponential backoff up to `max_attempts` times, and a running
+job whose worker died is picked up again once its lease expires.
+
+Jobs are keyed on the SHA-256 of the PDF, so enqueueing the same file twice
+returns the existing job instead of parsing it again.
+"""
+import os
+import json
+import time
+
+from database import connection, transaction, safe_load_json, add_candidates_bulk
+from extraction_cache import file_hash
+from profile_utils import clean_profile
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_RETRY_BASE_SECONDS = 5
+
+STATUSES = ("queued", "running", "done", "failed")
+
+_JOB_COLUMNS = ("id, file_hash, filename, auto_save, status, attempts, max_attempts, error, result, "
+                "candidate_id, merged, worker, created_at, updated_at")
+
+
+def _row_to_job(row):
+    job = dict(zip([c.strip() for c in _JOB_COLUMNS.split(",")], row))
+    job["auto_save"] = bool(job["auto_save"])
+    job["merged"] = bool(job["merged"])
+    job["result"] = safe_load_json(job["result"], None)
+    return job
+
+
+def save_profile(filename, profile_data):
+    """Save a parsed profile as a candidate; returns (candidate_id, merged) as add_candidates_bulk does."""
+    profile = clean_profile(profile_data)
+    if not profile["name"]:
+        profile["name"] = os.path.splitext(os.path.basename(filename))[0]
+    # A stored email means the same person: merge into that candidate and flag it on the job
+    [(candidate_id, merged)] = add_candidates_bulk([profile])
+    return candidate_id, merged
+
+
+def enqueue(filename, pdf_bytes, auto_save=False, max_attempts=None):
+    """Queue a PDF for parsing and return its job ID.
+
+    If the same file was queued before, the existing job is returned; a job
+    that had failed for good is reset and queued again. Asking to auto-save a
+    file that was already parsed without saving saves its stored result.
+    """
+    digest = file_hash(pdf_bytes)
+    now = time.time()
+    with transaction() as cursor:
+        row = cursor.execute(
+            "SELECT id, status, auto_save, candidate_id, result FROM jobs WHERE file_hash = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            cursor.execute("""
+                INSERT INTO jobs (file_hash, filename, pdf, auto_save, max_attempts,
+                                  created_at, updated_at, available_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (digest, filename, pdf_bytes, int(auto_save), max_attempts or JOB_MAX_ATTEMPTS, now, now, now))
+            return cursor.lastrowid
+
+        job_id, status, existing_auto_save, candidate_id, result = row
+        if status == "failed":
+            cursor.execute("""
+                UPDATE jobs SET status = 'queued', attempts = 0, error = NULL, pdf = ?, filename = ?,
+                                auto_save = ?, updated_at = ?, available_at = ?
+                WHERE id = ?
+            """, (pdf_bytes, filename, int(auto_save), now, now, job_id))
+        elif auto_save and not existing_auto_save and status != "done":
+            # A running job picks this up in complete()
+            cursor.execute("UPDATE jobs SET auto_save = 1, updated_at = ? WHERE id = ?", (now, job_id))
+        if not (auto_save and not existing_auto_save and status == "done" and candidate_id is None):
+            return job_id
+
+    # Parsed earlier (e.g. via Parse Resume) but never saved; the PDF is gone, the result is not
+    candidate_id, merged = save_profile(filename, safe_load_json(result, {}))
+    with transaction() as cursor:
+        cursor.execute("UPDATE jobs SET auto_save = 1, candidate_id = ?, merged = ?, updated_at = ? WHERE id = ?",
+                       (candidate_id, int(merged), time.time(), job_id))
+    return job_id
+
+
+def claim(worker_id):
+    """Atomically take the oldest runnable job for `worker_id`.
+
+    Returns {"id", "filename", "pdf", "auto_save", "attempts"} or None when
+    nothing is runnable. Jobs left running by a crashed worker are reclaimed
+    after their lease expires, unless they have used up their attempts: a
+    PDF that keeps crashing or hanging its worker fails instead.
+    """
+    now = time.time()
+    with transaction() as cursor:
+        cursor.execute("""
+            UPDATE jobs SET status = 'failed', updated_at = ?, lease_expires_at = NULL,
+                            error = 'Worker stopped responding after ' || attempts || ' attempt(s)'
+            WHERE status = 'running' AND lease_expires_at < ? AND attempts >= max_attempts
+        """, (now, now))
+        row = cursor.execute("""
+            SELECT id FROM jobs
+            WHERE (status = 'queued' AND available_at <= ?)
+               OR (status = 'running' AND lease_expires_at < ?)
+            ORDER BY available_at, id
+            LIMIT 1
+        """, (now, now)).fetchone()
+        if row is None:
+            return None
+        cursor.execute("""
+            UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?,
+                            updated_at = ?, lease_expires_at = ?
+            WHERE id = ?
+        """, (worker_id, now, now + JOB_LEASE_SECONDS, row[0]))
+        job_id, filename, pdf, auto_save, attempts = cursor.execute(
+            "SELECT id, filename, pdf, auto_save, attempts FROM jobs WHERE id = ?", (row[0],)
+        ).fetchone()
+    return {"id": job_id, "filename": filename, "pdf": pdf, "auto_save": bool(auto_save), "attempts": attempts}
+
+
+def complete(job_id, result, candidate_id=None, merged=False):
+    """Mark a job done with its extracted profile; the PDF is no longer needed.
+
+    `merged` records that the saved profile was merged into an existing
+    candidate with the same email. If auto-save was asked for after the
+    worker claimed the job (see enqueue), the profile is saved here.
+    """
+    with transaction() as cursor:
+        cursor.execute("""
+            UPDATE jobs SET status = 'done', result = ?, candidate_id = ?, merged = ?, error = NULL, pdf = NULL,
+                            updated_at = ?, lease_expires_at = NULL
+            WHERE id = ?
+        """, (json.dumps(result), candidate_id, int(merged), time.time(), job_id))
+        row = cursor.execute("SELECT auto_save, filename FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row and row[0] and candidate_id is None:
+        candidate_id, merged = save_profile(row[1], result)
+        with transaction() as cursor:
+            cursor.execute("UPDATE jobs SET candidate_id = ?, merged = ?, updated_at = ? WHERE id = ?",
+                           (candidate_id, int(merged), time.time(), job_id))
+
+
+def fail(job_id, error, retry=True):
+    """Record a failed attempt; requeue with backoff while attempts remain."""
+    now = time.time()
+    with transaction() as cursor:
+        row = cursor.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return
+        attempts, max_attempts = row
+        if retry and attempts < max_attempts:
+            cursor.execute("""
+                UPDATE jobs SET status = 'queued', error = ?, updated_at = ?, available_at = ?,
+                                lease_expires_at = NULL
+                WHERE id = ?
+            """, (str(error), now, now + JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), job_id))
+        else:
+            cursor.execute("""
+                UPDATE jobs SET status = 'failed', error = ?, updated_at = ?, lease_expires_at = NULL
+                WHERE id = ?
+            """, (str(error), now, job_id))
+
+
+def get_jobs(job_ids):
+    """Jobs by ID (without the PDF), in the order given."""
+    if not job_ids:
+        return []
+    placeholders = ",".join("?" * len(job_ids))
+    with connection() as conn:
+        rows = conn.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id IN ({placeholders})", list(job_ids)).fetchall()
+    jobs = {row[0]: _row_to_job(row) for row in rows}
+    return [jobs[i] for i in job_ids if i in jobs]
+
+
+def get_job(job_id):
+    jobs = get_jobs([job_id])
+    return jobs[0] if jobs else None
+
+
+def list_jobs(status=None, limit=50):
+    """Most recently updated jobs, optionally only those in one status."""
+    sql = f"SELECT {_JOB_COLUMNS} FROM jobs"
+    params = []
+    if status:
+        sql += " WHERE status = ?"
+        params.append(status)
+    sql += " ORDER BY updated_at DESC LIMIT ?"
+    params.append(limit)
+    with connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [_row_to_job(row) for row in rows]
+
+
+def status_counts():
+    """Number of jobs in each status."""
+    counts = dict.fromkeys(STATUSES, 0)
+    with connection() as conn:
+        counts.update(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+    return counts
+
+
+def delete_job(job_id):
+    with transaction() as cursor:
+        cursor.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
@@ -0,0 +1,245 @@
+"""Shared HTTP client for the Groq (OpenAI-compatible) chat completions API.
+
+One pooled requests.Session is reused by every caller so connections stay
+alive between calls. Requests get connect/read timeouts, retries with
+jittered exponential backoff on 429/5xx and network errors (honouring
+Retry-After), server-sent-event streaming, and a client-side token bucket that keeps the whole process
+under the account's requests-per-minute and tokens-per-minute limits.
+
+Limits are configured through the environment:
+
+- GROQ_RPM / GROQ_TPM: requests and tokens per minute (0 disables the limit)
+- GROQ_MAX_CONCURRENCY: in-flight requests (and pooled connections)
+- GROQ_CONNECT_TIMEOUT / GROQ_READ_TIMEOUT: seconds
+- GROQ_MAX_RETRIES: retry attempts after the first try
+"""
+import os
+import json
+import time
+import random
+import logging
+import threading
+
+import metrics
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """Raised when a chat completion fails after all retries."""
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` tokens a minute (locked by RateLimiter)."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` tokens are available (0 if they are now). Caller holds the lock."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        """Take tokens; may go negative when reconciling with actual usage. Caller holds the lock."""
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Blocks callers until both the request and the token budget allow another call."""
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.lock = threading.Lock()
+
+    def acquire(self, estimated_tokens):
+        while True:
+            with self.lock:
+                wait = 0.0
+                if self.requests:
+                    wait = max(wait, self.requests.wait_time(1))
+                if self.tokens:
+                    wait = max(wait, self.tokens.wait_time(estimated_tokens))
+                if wait <= 0:
+                    if self.requests:
+                        self.requests.consume(1)
+                    if self.tokens:
+                        self.tokens.consume(estimated_tokens)
+                    return
+            time.sleep(wait)
+
+    def reconcile(self, estimated_tokens, actual_tokens):
+        """Correct the token bucket once the response reports real usage."""
+        if self.tokens and actual_tokens:
+            with self.lock:
+                self.tokens._refill()
+                self.tokens.tokens += estimated_tokens - actual_tokens
+
+
+def estimate_tokens(payload):
+    """Rough prompt + completion token estimate (~4 characters per token)."""
+    prompt_chars = sum(len(m.get("content") or "") for m in payload.get("messages", []))
+    return prompt_chars // 4 + int(payload.get("max_tokens") or 0)
+
+
+def _retry_after(resp):
+    """Seconds requested by a Retry-After header, if any."""
+    value = resp.headers.get("Retry-After") if resp is not None else None
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+class LLMClient:
+    def __init__(self, base_url, api_key, requests_per_minute=0, tokens_per_minute=0,
+                 max_concurrency=8, connect_timeout=5.0, read_timeout=60.0,
+                 max_retries=4, backoff_base=0.5, backoff_max=20.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        # Never run more requests than pooled connections, so every call reuses a live socket
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+
+        # requests is imported here rather than at module level so importing this module stays cheap
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"})
+
+    def _backoff(self, attempt, resp=None):
+        retry_after = _retry_after(resp)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Full jitter: spread retries from concurrent callers instead of synchronising them
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _post(self, payload, stream=False):
+        """POST with rate limiting and retries; returns a successful Response or raises LLMError."""
+        import requests
+
+        url = f"{self.base_url}/chat/completions"
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            resp = None
+            try:
+                resp = self.session.post(url, json=payload, timeout=self.timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = str(e)
+            else:
+                if resp.status_code < 400:
+                    return resp
+                last_error = f"HTTP {resp.status_code}: {resp.text}"
+                # Hand the connection back to the session's pool whether or not we retry
+                resp.close()
+                if resp.status_code not in RETRY_STATUS:
+                    raise LLMError(last_error)
+            if attempt < self.max_retries:
+                metrics.inc("llm_retries", status=resp.status_code if resp is not None else "network")
+                time.sleep(self._backoff(attempt, resp))
+        raise LLMError(last_error)
+
+    def chat_completion(self, payload):
+        """Run a chat completion and return the decoded JSON response."""
+        estimated = estimate_tokens(payload)
+        self.limiter.acquire(estimated)
+        with self.slots:
+            resp = self._post(payload)
+            try:
+                data = resp.json()
+            except ValueError as e:
+                raise LLMError(f"Invalid JSON from LLM API: {e}")
+        usage = data.get("usage") or {}
+        self._record_usage(estimated, usage)
+        return data
+
+    def _record_usage(self, estimated, usage):
+        metrics.inc("llm_requests")
+        if usage:
+            metrics.inc("llm_tokens", usage.get("prompt_tokens") or 0, kind="prompt")
+            metrics.inc("llm_tokens", usage.get("completion_tokens") or 0, kind="completion")
+            logger.info("LLM usage: prompt_tokens=%s completion_tokens=%s (estimated %d)",
+                        usage.get("prompt_tokens"), usage.get("completion_tokens"), estimated)
+        self.limiter.reconcile(estimated, usage.get("total_tokens"))
+
+    def stream_chat_completion(self, payload):
+        """Run a streaming chat completion, yielding content deltas as they arrive."""
+        import requests
+
+        payload = dict(payload, stream=True)
+        estimated = estimate_tokens(payload)
+        self.limiter.acquire(estimated)
+        usage = {}
+        with self.slots:
+            resp = self._post(payload, stream=True)
+            try:
+                # chunk_size=None hands over bytes as soon as they arrive instead of buffering
+                for line in resp.iter_lines(chunk_size=None):
+                    if not line.startswith(b"data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except ValueError:
+                        continue
+                    usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+                    for choice in chunk.get("choices") or []:
+                        content = (choice.get("delta") or {}).get("content")
+                        if content:
+                            yield content
+            except requests.exceptions.RequestException as e:
+                raise LLMError(f"Stream interrupted: {e}")
+            finally:
+                resp.close()
+        self._record_usage(estimated, usage)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _env_number(name, default):
+    return float(os.getenv(name, default))
+
+
+def get_client(base_url, api_key):
+    """Return the process-wide client for this endpoint, creating it on first use."""
+    key = (base_url, api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = LLMClient(
+                base_url,
+                api_key,
+                requests_per_minute=_env_number("GROQ_RPM", 30),
+                tokens_per_minute=_env_number("GROQ_TPM", 6000),
+                max_concurrency=int(_env_number("GROQ_MAX_CONCURRENCY", 8)),
+                connect_timeout=_env_number("GROQ_CONNECT_TIMEOUT", 5),
+                read_timeout=_env_number("GROQ_READ_TIMEOUT", 60),
+                max_retries=int(_env_number("GROQ_MAX_RETRIES", 4)),
+            )
+            _clients[key] = client
+        return client
@@ -0,0 +1,191 @@
+"""Job-description matching across every stored candidate.
+
+Each profile is turned into hashed word uni/bi-gram term frequencies when it
+is saved (see database.py). At query time the stored vectors are loaded
+once per table revision into CSR arrays with TF-IDF weights and row norms
+precomputed, so ranking the whole pool is a single sparse matrix-vector
+product in NumPy, with no network calls and no GPU. Only the top few
+candidates can optionally be reranked by the LLM.
+"""
+import re
+import math
+import zlib
+import threading
+from array import array
+from functools import lru_cache
+
+from skills import normalize_skill
+
+DIM = 1 << 20            # hashed feature space; large enough that collisions are rare
+MAX_FEATURES = 256       # strongest terms kept per profile
+SKILL_WEIGHT = 2.0       # skills say more about fit than prose
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the this to was were will with
+we you your they their he she his her i me my us who what which when where how all any can may must
+should would could able about into over under more most other such than then there these those also
+""".split())
+
+
+@lru_cache(maxsize=100_000)
+def _canonical(token):
+    """Map a word through the skill aliases ("k8s" -> "kubernetes")."""
+    normalized = normalize_skill(token)
+    return normalized[0] if normalized else token
+
+
+def tokens(text):
+    """Lowercased words of `text` without stopwords, with skill aliases canonicalized."""
+    out = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        token = token.rstrip(".")
+        if token and token not in _STOPWORDS:
+            out.append(_canonical(token))
+    return out
+
+
+@lru_cache(maxsize=200_000)
+def _hash(term):
+    return zlib.crc32(term.encode("utf-8")) & (DIM - 1)
+
+
+def _add_text(counts, text, weight=1.0):
+    words = tokens(text)
+    for i, token in enumerate(words):
+        h = _hash(token)
+        counts[h] = counts.get(h, 0.0) + weight
+        if i:
+            bigram = _hash(words[i - 1] + " " + token)
+            counts[bigram] = counts.get(bigram, 0.0) + weight
+
+
+def text_features(counts):
+    """Sublinear term frequencies -> (indices, weights) arrays, capped at MAX_FEATURES."""
+    items = sorted(((1.0 + math.log(c), i) for i, c in counts.items() if c > 0), reverse=True)[:MAX_FEATURES]
+    items.sort(key=lambda x: x[1])
+    return array("i", (i for _, i in items)), array("f", (w for w, _ in items))
+
+
+def profile_features(profile):
+    """Hashed term-frequency features for a profile, from summary, skills and experience."""
+    counts = {}
+    _add_text(counts, profile.get("summary"))
+    skills = profile.get("skills") or []
+    if isinstance(skills, str):
+        skills = [skills]
+    for skill in skills:
+        if isinstance(skill, str):
+            normalized = normalize_skill(skill)
+            if normalized:
+                # Index the canonical skill as one term as well as its words
+                counts[_hash(normalized[0])] = counts.get(_hash(normalized[0]), 0.0) + SKILL_WEIGHT
+            _add_text(counts, skill, SKILL_WEIGHT)
+    for exp in profile.get("experience") or []:
+        if isinstance(exp, dict):
+            _add_text(counts, " ".join(str(exp.get(k) or "") for k in ("title", "company", "description")))
+    return text_features(counts)
+
+
+def serialize_features(features):
+    indices, weights = features
+    return indices.tobytes(), weights.tobytes()
+
+
+# --- Scoring ---
+_matrix_lock = threading.Lock()
+_matrix = {}  # DB_NAME -> (revision, matrix dict)
+
+
+def _load_matrix():
+    """Stored vectors as CSR arrays with IDF and row norms, cached per table revision."""
+    import numpy as np
+    import database
+
+    revision = database.get_revision()
+    with _matrix_lock:
+        cached = _matrix.get(database.DB_NAME)
+        if cached and cached[0] == revision:
+            return cached[1]
+
+    with database.connection() as conn:
+        rows = conn.execute("""
+            SELECT v.candidate_id, c.name, v.indices, v.weights
+            FROM candidate_vectors v JOIN candidates c ON c.id = v.candidate_id
+            ORDER BY v.candidate_id
+        """).fetchall()
+    ids = np.array([r[0] for r in rows], dtype=np.int64)
+    names = [r[1] for r in rows]
+    indices = np.frombuffer(b"".join(r[2] for r in rows), dtype=np.int32)
+    data = np.frombuffer(b"".join(r[3] for r in rows), dtype=np.float32)
+    lengths = np.array([len(r[2]) // 4 for r in rows], dtype=np.int64)
+
+    # Smoothed IDF from document frequencies over the whole pool
+    doc_freq = np.bincount(indices, minlength=DIM).astype(np.float32)
+    idf = np.log((1.0 + len(rows)) / (1.0 + doc_freq)) + 1.0
+    data = data * idf[indices]
+    row_of = np.repeat(np.arange(len(rows)), lengths)
+    norms = np.sqrt(np.bincount(row_of, weights=data * data, minlength=len(rows)))
+    norms[norms == 0] = 1.0
+
+    matrix = {"ids": ids, "names": names, "indices": indices, "data": data,
+              "row_of": row_of, "norms": norms, "idf": idf}
+    with _matrix_lock:
+        _matrix[database.DB_NAME] = (revision, matrix)
+    return matrix
+
+
+def rank_candidates(job_description, top_k=10):
+    """Top-k candidates by cosine similarity to the job description, as [{"id", "name", "score"}]."""
+    import numpy as np
+
+    matrix = _load_matrix()
+    if not len(matrix["ids"]):
+        return []
+
+    counts = {}
+    _add_text(counts, job_description)
+    q_indices, q_weights = text_features(counts)
+    query = np.zeros(DIM, dtype=np.float32)
+    q_indices = np.frombuffer(q_indices.tobytes(), dtype=np.int32)
+    query[q_indices] = np.frombuffer(q_weights.tobytes(), dtype=np.float32) * matrix["idf"][q_indices]
+    q_norm = float(np.linalg.norm(query))
+    if q_norm == 0:
+        return []
+
+    # Sparse matrix-vector product: gather query weights per stored term, sum per row
+    scores = np.bincount(matrix["row_of"], weights=matrix["data"] * query[matrix["indices"]],
+                         minlength=len(matrix["ids"]))
+    scores /= matrix["norms"] * q_norm
+
+    top_k = min(top_k, len(scores))
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    top = top[np.argsort(-scores[top])]
+    return [
+        {"id": int(matrix["ids"][i]), "name": matrix["names"][i], "score": round(float(scores[i]), 4)}
+        for i in top if scores[i] > 0
+    ]
+
+
+def match_job_description(job_description, top_k=10, rerank_top=0):
+    """Rank candidates for a job description, optionally reranking the best `rerank_top` with the LLM."""
+    ranked = rank_candidates(job_description, top_k=top_k)
+    if not rerank_top or not ranked:
+        return ranked
+
+    import database
+    from data_extractor import rerank_candidates_for_job
+
+    head, tail = ranked[:rerank_top], ranked[rerank_top:]
+    profiles = [database.get_candidate_by_id(r["id"]) for r in head]
+    reranked = rerank_candidates_for_job(job_description, [p for p in profiles if p])
+    if "error" in reranked:
+        return ranked
+
+    llm_scores = {str(item["id"]): item for item in reranked["rankings"]}
+    for r in head:
+        item = llm_scores.get(str(r["id"]), {})
+        r["llm_score"] = item.get("score")
+        r["reason"] = item.get("reason", "")
+    head.sort(key=lambda r: (r.get("llm_score") is not None, r.get("llm_score") or 0, r["score"]), reverse=True)
+    return head + tail
@@ -0,0 +1,219 @@
+"""Process-wide timing spans, counters and their export.
+
+Spans record how long each stage took (PDF text extraction, the LLM round
+trip, JSON decoding, database calls...) into a latency histogram per span
+name, plus a window of recent samples for percentiles. Counters track LLM
+token usage. Everything can be exported in Prometheus text format, and each
+span is optionally appended to a JSONL file:
+
+- METRICS_JSONL: path of a JSONL file to append one line per span to
+- METRICS_PORT: serve /metrics in Prometheus text format on this port
+"""
+import os
+import json
+import time
+import bisect
+import inspect
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from collections import deque
+
+METRICS_JSONL = os.getenv("METRICS_JSONL", "")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+RECENT_SAMPLES = 1000
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_spans = {}      # span name -> _Histogram
+_counters = {}   # (name, sorted label items) -> value
+_jsonl = None
+_server = None
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds, ok):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.errors += not ok
+        self.recent.append(seconds)
+
+
+def _write_jsonl(record):
+    global _jsonl
+    if _jsonl is None:
+        _jsonl = open(METRICS_JSONL, "a", encoding="utf-8", buffering=1)
+    _jsonl.write(json.dumps(record) + "\n")
+
+
+def observe(name, seconds, ok=True):
+    """Record one span duration."""
+    with _lock:
+        hist = _spans.get(name)
+        if hist is None:
+            hist = _spans[name] = _Histogram()
+        hist.observe(seconds, ok)
+        if METRICS_JSONL:
+            _write_jsonl({"ts": round(time.time(), 3), "span": name, "seconds": round(seconds, 6), "ok": ok})
+
+
+def inc(name, value=1, **labels):
+    """Add to a counter, e.g. inc("llm_tokens", 120, kind="prompt")."""
+    if not value:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+        if METRICS_JSONL:
+            _write_jsonl({"ts": round(time.time(), 3), "counter": name, "labels": labels, "value": value})
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block; exceptions are counted as errors and re-raised."""
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        observe(name, time.perf_counter() - start, ok)
+
+
+def timed(name):
+    """Decorator form of span(). Generator functions are timed until exhausted."""
+    def decorate(fn):
+        if inspect.isgeneratorfunction(fn):
+            @wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                ok = False
+                try:
+                    yield from fn(*args, **kwargs)
+                    ok = True
+                except GeneratorExit:
+                    ok = True  # the consumer stopped early
+                    raise
+                finally:
+                    observe(name, time.perf_counter() - start, ok)
+            return gen_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                # Functions that report failure as {"error": ...} count as errors too
+                ok = not (isinstance(result, dict) and "error" in result)
+                return result
+            finally:
+                observe(name, time.perf_counter() - start, ok)
+        return wrapper
+    return decorate
+
+
+def _percentile(ordered, p):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+
+def snapshot():
+    """Current span stats (recent-window percentiles in ms) and counter values."""
+    with _lock:
+        spans = {name: (h.count, h.sum, h.errors, sorted(h.recent)) for name, h in _spans.items()}
+        counters = dict(_counters)
+    return {
+        "spans": {
+            name: {
+                "count": count,
+                "errors": errors,
+                "mean_ms": round(total / count * 1000, 3) if count else None,
+                **{f"p{p}_ms": round(_percentile(recent, p) * 1000, 3) if recent else None for p in (50, 95, 99)},
+            }
+            for name, (count, total, errors, recent) in sorted(spans.items())
+        },
+        "counters": [{"name": name, "labels": dict(labels), "value": value}
+                     for (name, labels), value in sorted(counters.items())],
+    }
+
+
+def _labels(items):
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in items) + "}"
+
+
+def prometheus_text(prefix="hr_"):
+    """All spans and counters in the Prometheus text exposition format."""
+    with _lock:
+        spans = {name: (list(h.buckets), h.count, h.sum, h.errors) for name, h in _spans.items()}
+        counters = dict(_counters)
+
+    lines = [f"# HELP {prefix}span_duration_seconds Time spent per instrumented stage.",
+             f"# TYPE {prefix}span_duration_seconds histogram"]
+    for name, (buckets, count, total, _) in sorted(spans.items()):
+        cumulative = 0
+        for bound, n in zip(BUCKETS + (float("inf"),), buckets):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{prefix}span_duration_seconds_bucket{{span="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'{prefix}span_duration_seconds_sum{{span="{name}"}} {total}')
+        lines.append(f'{prefix}span_duration_seconds_count{{span="{name}"}} {count}')
+
+    lines += [f"# HELP {prefix}span_errors_total Instrumented calls that raised or returned an error.",
+              f"# TYPE {prefix}span_errors_total counter"]
+    for name, (_, _, _, errors) in sorted(spans.items()):
+        lines.append(f'{prefix}span_errors_total{{span="{name}"}} {errors}')
+
+    for counter in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {prefix}{counter}_total counter")
+        for (name, labels), value in sorted(counters.items()):
+            if name == counter:
+                lines.append(f"{prefix}{name}_total{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def start_http_server(port=None):
+    """Serve /metrics in Prometheus text format from a daemon thread (once per process)."""
+    global _server
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    port = METRICS_PORT if port is None else port
+    with _lock:
+        if _server is not None or not port:
+            return _server
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                found = self.path.split("?")[0] == "/metrics"
+                body = prometheus_text().encode("utf-8") if found else b"not found\n"
+                self.send_response(200 if found else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        _server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
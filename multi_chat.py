@@ -0,0 +1,100 @@
+"""Ask one question across a shortlist of candidates.
+
+The pool is first narrowed locally: when the shortlist is larger than
+MULTI_CHAT_MAX_CANDIDATES, only the profiles whose stored fields share the
+most terms with the question are asked. The per-candidate questions then run
+concurrently (at most MULTI_CHAT_CONCURRENCY in flight, on top of the LLM
+client's own rate limits) and are yielded as each one finishes, and a single
+synthesis call compares the answers. Total latency is about two LLM round
+trips however many candidates are asked.
+
+Per-candidate answers go through generate_chatbot_response, so they share the
+answer cache with the single-candidate chat.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import metrics
+from dedupe import profile_text
+from matching import tokens
+from llm_client import get_client
+from data_extractor import GROQ_API_KEY, GROQ_BASE_URL, MODEL_NAME, generate_chatbot_response
+
+MULTI_CHAT_MAX_CANDIDATES = int(os.getenv("MULTI_CHAT_MAX_CANDIDATES", "10"))
+MULTI_CHAT_CONCURRENCY = int(os.getenv("MULTI_CHAT_CONCURRENCY", "8"))
+SYNTHESIS_ANSWER_CHARS = 600   # per-candidate answer length passed to the synthesis step
+
+
+def narrow_candidates(question, profiles, limit=None):
+    """Split profiles into (asked, skipped) by how many question terms their stored fields contain.
+
+    Nothing is skipped while the shortlist fits within `limit`; otherwise the
+    best-matching `limit` profiles are kept, ties in shortlist order.
+    """
+    limit = MULTI_CHAT_MAX_CANDIDATES if limit is None else limit
+    profiles = [p for p in profiles if p]
+    if len(profiles) <= limit:
+        return profiles, []
+
+    terms = set(tokens(question))
+    scored = sorted(
+        enumerate(profiles),
+        key=lambda item: (-len(terms & set(tokens(profile_text(item[1])))), item[0]),
+    )
+    ranked = [profile for _, profile in scored]
+    return ranked[:limit], ranked[limit:]
+
+
+def iter_answers(question, profiles, max_workers=None):
+    """Yield {"id", "name", "answer", "seconds"} per candidate in the order the answers finish."""
+    if not profiles:
+        return
+
+    def ask(profile):
+        start = time.perf_counter()
+        with metrics.span("multi_chat.answer"):
+            answer = generate_chatbot_response(question, profile)
+        return {"id": profile.get("id"), "name": profile.get("name"), "answer": answer,
+                "seconds": round(time.perf_counter() - start, 3)}
+
+    workers = min(max_workers or MULTI_CHAT_CONCURRENCY, len(profiles))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(ask, profile) for profile in profiles]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _synthesis_payload(question, answers):
+    lines = "\n".join(
+        f"- {a['name']} (#{a['id']}): {(a['answer'] or '').strip()[:SYNTHESIS_ANSWER_CHARS]}" for a in answers
+    )
+    prompt = f"""A recruiter asked this question about each shortlisted candidate:
+{question}
+
+Answers per candidate, each based only on that candidate's profile:
+{lines}
+
+Answer the recruiter's question across the shortlist. Name the candidates that fit, say briefly why,
+and mention candidates whose profiles don't say."""
+    return {
+        "model": MODEL_NAME,
+        "messages": [
+            {"role": "system", "content": "You are an HR assistant comparing candidates using only the answers given."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.3,
+        "max_tokens": 400
+    }
+
+
+@metrics.timed("multi_chat.synthesis")
+def stream_synthesis(question, answers):
+    """Stream one comparison across the per-candidate answers, for st.write_stream."""
+    if not GROQ_API_KEY:
+        yield "Groq API key missing in .env"
+        return
+    try:
+        yield from get_client(GROQ_BASE_URL, GROQ_API_KEY).stream_chat_completion(_synthesis_payload(question, answers))
+    except Exception as e:
+        yield f"Error: {e}"
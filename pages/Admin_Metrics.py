@@ -0,0 +1,49 @@
+import streamlit as st
+
+import metrics
+
+# --- Admin: latency and token spend for this server process ---
+st.set_page_config(page_title="Metrics - AI HR Assistant", page_icon="📊", layout="wide")
+st.title("📊 Metrics")
+st.caption("Recent latencies (last 1000 calls per span) and LLM token spend since this server process started.")
+
+snap = metrics.snapshot()
+
+tokens = {(c["name"], c["labels"].get("kind")): c["value"] for c in snap["counters"]}
+fast_path = {c["labels"].get("outcome"): c["value"] for c in snap["counters"] if c["name"] == "chat_fast_path"}
+asked = fast_path.get("hit", 0) + fast_path.get("miss", 0)
+col1, col2, col3, col4, col5 = st.columns(5)
+col1.metric("LLM requests", tokens.get(("llm_requests", None), 0))
+col2.metric("Prompt tokens", tokens.get(("llm_tokens", "prompt"), 0))
+col3.metric("Completion tokens", tokens.get(("llm_tokens", "completion"), 0))
+col4.metric("Retries", sum(c["value"] for c in snap["counters"] if c["name"] == "llm_retries"))
+col5.metric("Answered from profile", f"{fast_path.get('hit', 0)} / {asked}",
+            f"{fast_path.get('hit', 0) / asked:.0%} of chat questions" if asked else None, delta_color="off")
+
+with st.expander("All counters"):
+    # Includes chat_prompt_tokens (estimated prompt size by part) next to the LLM-reported usage
+    st.dataframe(
+        [{"counter": c["name"], "labels": ", ".join(f"{k}={v}" for k, v in c["labels"].items()), "value": c["value"]}
+         for c in snap["counters"]],
+        use_container_width=True,
+        hide_index=True,
+    )
+
+st.subheader("Latency by stage")
+if snap["spans"]:
+    st.dataframe(
+        [{"span": name, **stats} for name, stats in snap["spans"].items()],
+        use_container_width=True,
+        hide_index=True,
+    )
+else:
+    st.info("No instrumented calls yet.")
+
+col1, col2, _ = st.columns([1, 1, 4])
+if col1.button("🔄 Refresh"):
+    st.rerun()
+if col2.button("Reset"):
+    metrics.reset()
+    st.rerun()
+st.download_button("Download Prometheus metrics", metrics.prometheus_text(), file_name="metrics.prom",
+                   mime="text/plain")
@@ -0,0 +1,97 @@
+import re
+
+# --- Helpers: cleaning/sanitization ---
+def _strip(v):
+    # The LLM sometimes returns years, GPAs or durations as numbers; keep them as text
+    return str(v).strip() if v is not None else ""
+
+def parse_skills(skills_text: str):
+    parts = re.split(r"[,\n;]", skills_text or "")
+    out, seen = [], set()
+    for p in parts:
+        s = _strip(p)
+        key = s.lower()
+        if s and key not in seen:
+            out.append(s)
+            seen.add(key)
+    return out
+
+def clean_experience(entries):
+    cleaned = []
+    for e in entries or []:
+        company = _strip(e.get("company", ""))
+        title = _strip(e.get("title", ""))
+        duration = _strip(e.get("duration", ""))
+        description = _strip(e.get("description", ""))
+        if company or title or duration or description:
+            cleaned.append({
+                "company": company,
+                "title": title,
+                "duration": duration,
+                "description": description
+            })
+    return cleaned
+
+
+def clean_education(entries):
+    cleaned = []
+    for e in entries or []:
+        degree = _strip(e.get("degree", ""))
+        institution = _strip(e.get("institution", ""))
+        year = _strip(e.get("year", ""))
+        if degree or institution or year:
+            cleaned.append({"degree": degree, "institution": institution, "year": year})
+    return cleaned
+
+def clean_profile(profile):
+    """Normalize an LLM-extracted profile into the shape the edit forms save."""
+    skills = profile.get("skills") or []
+    if isinstance(skills, str):
+        skills_text = skills
+    else:
+        skills_text = "\n".join(s for s in skills if isinstance(s, str))
+    experience = [e for e in profile.get("experience") or [] if isinstance(e, dict)]
+    education = [e for e in profile.get("education") or [] if isinstance(e, dict)]
+    return {
+        "name": _strip(profile.get("name")),
+        "email": _strip(profile.get("email")),
+        "phone": _strip(profile.get("phone")),
+        "linkedin_profile": _strip(profile.get("linkedin_profile")),
+        "summary": _strip(profile.get("summary")),
+        "skills": parse_skills(skills_text),
+        "experience": clean_experience(experience),
+        "education": clean_education(education),
+    }
+
+def _dedupe_key(*values):
+    return tuple(re.sub(r"[^a-z0-9]+", "", v.lower()) for v in values)
+
+def merge_profiles(parts):
+    """Merge partial profiles extracted from chunks of one resume.
+
+    Scalar fields take the first non-empty value in chunk order; skills are
+    unioned; experience and education entries seen in more than one chunk
+    (overlapping windows) are kept once, with the longer description.
+    """
+    merged = {}
+    for field in ("name", "email", "phone", "linkedin_profile", "summary"):
+        merged[field] = next((_strip(p.get(field)) for p in parts if _strip(p.get(field))), "")
+
+    skills = []
+    for p in parts:
+        value = p.get("skills") or []
+        skills.extend([value] if isinstance(value, str) else [s for s in value if isinstance(s, str)])
+    merged["skills"] = parse_skills("\n".join(skills))
+
+    experience = {}
+    for e in clean_experience(e for p in parts for e in p.get("experience") or [] if isinstance(e, dict)):
+        key = _dedupe_key(e["company"], e["title"], e["duration"])
+        if key not in experience or len(e["description"]) > len(experience[key]["description"]):
+            experience[key] = e
+    merged["experience"] = list(experience.values())
+
+    education = {}
+    for e in clean_education(e for p in parts for e in p.get("education") or [] if isinstance(e, dict)):
+        education.setdefault(_dedupe_key(e["degree"], e["institution"], e["year"]), e)
+    merged["education"] = list(education.values())
+    return merged
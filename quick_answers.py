@@ -0,0 +1,140 @@
+"""Local answers for structured profile questions.
+
+Questions such as "what's their email", "list their skills", "where did they
+study" or "how many jobs have they had" are answered straight from the
+stored profile in microseconds instead of costing an LLM round trip. The
+rules are deliberately strict: the whole question has to match one of the
+patterns below (filler words aside), so anything open-ended ("does their
+email look professional?") still goes to the model.
+
+Every question checked counts as a hit or a miss; stats() reports the hit
+rate, and the same counts are exported as the chat_fast_path metric.
+"""
+import re
+import threading
+
+import metrics
+from answer_cache import normalize_question
+
+# Leading words that don't change what is being asked
+_FILLER = (r"(?:(?:please|can you|could you|tell me|show me|give me|list|what|what's|whats|what is|what are|"
+           r"which|get|their|his|her|the|this|candidate's|candidate|candidates|person's|all|of)\s+)*")
+_PRONOUN = r"(?:they|he|she|the candidate|this candidate)"
+
+INTENTS = {
+    "email": [rf"{_FILLER}(?:e-?mail|e-?mail address|e-?mail id)"],
+    "phone": [rf"{_FILLER}(?:phone|phone number|mobile|mobile number|cell|cell number|contact number)"],
+    "linkedin": [rf"{_FILLER}linkedin(?: profile| url| link)?"],
+    "contact": [
+        rf"{_FILLER}contact(?: details| info| information)?",
+        rf"how (?:can|do|could) (?:i|we) (?:reach|contact) (?:them|him|her|the candidate)",
+    ],
+    "skills": [
+        rf"{_FILLER}(?:skills|skill set|skillset|technical skills|tech stack|technologies)",
+        rf"what (?:skills|technologies) (?:do|does) {_PRONOUN} (?:have|know)",
+    ],
+    "education": [
+        rf"{_FILLER}(?:education|educational background|degree|degrees|qualifications|academic background)",
+        rf"where did {_PRONOUN} (?:study|graduate|go to (?:school|college|university))",
+        rf"what did {_PRONOUN} study",
+    ],
+    "job_count": [
+        rf"how many (?:jobs|roles|positions|companies|employers) (?:have|has|did) {_PRONOUN}"
+        r"(?: had| held| worked (?:at|for)| have)?",
+    ],
+    "experience": [
+        rf"{_FILLER}(?:work history|employment history|work experience|experience|previous (?:jobs|roles|employers))",
+        rf"where (?:have|has|did) {_PRONOUN} work(?:ed)?",
+    ],
+}
+
+_COMPILED = {intent: [re.compile(rf"^{pattern}$") for pattern in patterns] for intent, patterns in INTENTS.items()}
+
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def classify(question):
+    """The intent a question asks for, or None when it needs the LLM."""
+    q = normalize_question(question).replace("’", "'")
+    for intent, patterns in _COMPILED.items():
+        if any(p.match(q) for p in patterns):
+            return intent
+    return None
+
+
+def _name(profile):
+    return profile.get("name") or "The candidate"
+
+
+def _missing(profile, what):
+    return f"No {what} is stored for {_name(profile)}."
+
+
+def _experience_lines(entries):
+    lines = []
+    for e in entries:
+        role = " at ".join(part for part in (e.get("title"), e.get("company")) if part)
+        lines.append(f"- {role or 'Untitled role'}" + (f" ({e['duration']})" if e.get("duration") else ""))
+    return lines
+
+
+def _answer(intent, profile):
+    name = _name(profile)
+    if intent in ("email", "phone", "linkedin"):
+        field, label = {"email": ("email", "email"), "phone": ("phone", "phone number"),
+                        "linkedin": ("linkedin_profile", "LinkedIn profile")}[intent]
+        value = (profile.get(field) or "").strip()
+        return f"{name}'s {label} is {value}." if value else _missing(profile, label)
+
+    if intent == "contact":
+        lines = [f"- {label}: {profile.get(field)}" for field, label in
+                 (("email", "Email"), ("phone", "Phone"), ("linkedin_profile", "LinkedIn")) if profile.get(field)]
+        return f"Contact details for {name}:\n" + "\n".join(lines) if lines else _missing(profile, "contact detail")
+
+    if intent == "skills":
+        skills = [s for s in profile.get("skills") or [] if isinstance(s, str) and s.strip()]
+        count = f"{len(skills)} skill" + ("s" if len(skills) != 1 else "")
+        return f"{name} lists {count}: {', '.join(skills)}." if skills else _missing(profile, "skill")
+
+    entries = [e for e in profile.get(intent if intent == "education" else "experience") or [] if isinstance(e, dict)]
+    if intent == "education":
+        if not entries:
+            return _missing(profile, "education")
+        lines = [f"- {', '.join(str(e[k]) for k in ('degree', 'institution', 'year') if e.get(k))}" for e in entries]
+        return f"{name}'s education:\n" + "\n".join(lines)
+
+    if not entries:
+        return _missing(profile, "work experience")
+    if intent == "job_count":
+        count = f"{len(entries)} job" + ("s" if len(entries) != 1 else "")
+        return f"{name} has listed {count}:\n" + "\n".join(_experience_lines(entries))
+    return f"{name}'s work history:\n" + "\n".join(_experience_lines(entries))
+
+
+def answer_locally(question, profile):
+    """Answer from the stored profile when the question is a structured lookup, else None."""
+    global _hits, _misses
+
+    intent = classify(question) if profile else None
+    with _lock:
+        if intent:
+            _hits += 1
+        else:
+            _misses += 1
+    metrics.inc("chat_fast_path", outcome="hit" if intent else "miss")
+    return _answer(intent, profile) if intent else None
+
+
+def stats():
+    """Questions answered locally vs. sent to the LLM."""
+    with _lock:
+        total = _hits + _misses
+        return {"hits": _hits, "misses": _misses, "hit_rate": _hits / total if total else 0.0}
+
+
+def reset():
+    global _hits, _misses
+    with _lock:
+        _hits = _misses = 0
@@ -0,0 +1,165 @@
+"""Deterministic resume pre-pass that runs before the LLM extraction call.
+
+Contact details (email, phone, LinkedIn) are pulled out with regexes, page
+furniture (page numbers, repeated headers/footers, "references available
+upon request") is stripped, whitespace is normalized, and the text is split
+into sections at recognizable headings. Only the sections the LLM needs to
+structure are sent to it; everything else is dropped from the prompt.
+"""
+import re
+from collections import Counter
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/(?:in|pub)/[A-Za-z0-9_%-]+/?", re.IGNORECASE)
+PHONE_RE = re.compile(r"(?<![\w/.])(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)[\s.-]?)?\d{3,5}[\s.-]?\d{3,4}(?:[\s.-]?\d{2,4})?(?![\w/])")
+# "Phone:", "Tel.", "Mobile no." etc. just before a number on the same line
+PHONE_LABEL_RE = re.compile(r"\b(?:phone|tel|telephone|mobile|mob|cell|ph|contact)\b[^\d\n]{0,15}$", re.IGNORECASE)
+
+# Canonical section -> heading pattern (matched against a whole, short line)
+SECTION_HEADINGS = {
+    "summary": r"(professional |career |executive )?(summary|profile|objective|about( me)?|overview)",
+    "experience": r"(work |professional |relevant |employment |career )?(experience|history|employment)( history)?|work",
+    "education": r"education( and training| & training)?|academic (background|qualifications)|qualifications",
+    "skills": r"(technical |core |key |professional )?(skills|competencies|expertise|technologies)( & tools| and tools)?|tech stack",
+    "projects": r"(personal |academic |key )?projects",
+    "certifications": r"certifications?|licenses?( (and|&) certifications)?|courses",
+    "publications": r"publications|research|papers|conference presentations",
+    "awards": r"awards|honou?rs|achievements|awards (and|&) honou?rs",
+    "languages": r"languages",
+    "interests": r"interests|hobbies|activities|volunteer(ing)?( experience)?|extracurricular activities",
+    "references": r"references",
+}
+_HEADING_RE = re.compile(
+    r"^\s*(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in SECTION_HEADINGS.items()) + r")\s*:?\s*$",
+    re.IGNORECASE,
+)
+
+# Sections worth sending to the LLM for structuring; the rest never reach the prompt
+LLM_SECTIONS = ("summary", "experience", "education", "skills", "projects", "certifications")
+
+_BOILERPLATE_RE = re.compile(
+    r"^\s*(?:page\s*\d+(\s*(of|/)\s*\d+)?|\d{1,3}|-\s*\d+\s*-|curriculum vitae|resume|r[ée]sum[ée]|"
+    r"references?( are)? available (up)?on request\.?)\s*$",
+    re.IGNORECASE,
+)
+
+
+def extract_contact(text):
+    """Email, phone and LinkedIn URL found in the text ('' when absent)."""
+    text = text or ""
+    email = EMAIL_RE.search(text)
+    linkedin = LINKEDIN_RE.search(text)
+    phone = ""
+    for match in PHONE_RE.finditer(text):
+        candidate = match.group(0).strip()
+        digits = re.sub(r"\D", "", candidate)
+        # Skip years and date ranges like "2015 - 2019"
+        if not 9 <= len(digits) <= 15 or re.fullmatch(r"(19|20)\d{2}\s*[-–]\s*(19|20)\d{2}", candidate):
+            continue
+        # A bare run of digits may be an ID or a zip code: require a phone shape (country code,
+        # area code in brackets, or three separated groups) or a label such as "Phone:"
+        shaped = candidate.startswith("+") or "(" in candidate or len(re.findall(r"\d+", candidate)) >= 3
+        if shaped or PHONE_LABEL_RE.search(text[max(0, match.start() - 30):match.start()]):
+            phone = candidate
+            break
+    linkedin_url = linkedin.group(0).rstrip("/") if linkedin else ""
+    return {
+        "email": email.group(0) if email else "",
+        "phone": phone,
+        "linkedin_profile": linkedin_url,
+    }
+
+
+def _repeated_lines(pages):
+    """Lines that appear on at least half the pages: running headers and footers."""
+    if not pages or len(pages) < 2:
+        return set()
+    counts = Counter()
+    for page in pages:
+        counts.update({line.strip() for line in page.splitlines() if line.strip()})
+    return {line for line, n in counts.items() if n >= max(2, len(pages) / 2)}
+
+
+def normalize_text(text, pages=None):
+    """Strip page furniture and collapse whitespace, keeping line structure."""
+    repeated = _repeated_lines(pages)
+    lines = []
+    for line in (text or "").splitlines():
+        line = re.sub(r"[ \t ]+", " ", line).strip()
+        if line in repeated or _BOILERPLATE_RE.match(line):
+            continue
+        if not line and (not lines or not lines[-1]):
+            continue
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def split_sections(text):
+    """Split normalized text into {"header": ..., section: ...} at recognized headings."""
+    sections = {"header": []}
+    current = "header"
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line) if len(line) <= 40 else None
+        if match:
+            current = match.lastgroup
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items() if "\n".join(lines).strip()}
+
+
+def preprocess_resume(text, pages=None):
+    """Run the local pre-pass.
+
+    Returns {"contact": {...}, "sections": {...}, "header": str, "llm_text": str}
+    where `header` is the text above the first heading and `llm_text` holds
+    only the header and the sections in LLM_SECTIONS, with contact details
+    removed. If no headings are recognized the whole
+    normalized text is used.
+    """
+    normalized = normalize_text(text, pages)
+    contact = extract_contact(normalized)
+    sections = split_sections(normalized)
+
+    def without_contact(block):
+        for value in contact.values():
+            if value:
+                block = block.replace(value, "")
+        return "\n".join(line for line in block.splitlines() if re.search(r"\w", line))
+
+    header = without_contact(sections.get("header", ""))
+    if set(sections) - {"header"}:
+        parts = [header]
+        for name in LLM_SECTIONS:
+            if sections.get(name):
+                parts.append(f"{name.upper()}\n{sections[name]}")
+        llm_text = "\n\n".join(p for p in parts if p)
+    else:
+        llm_text = without_contact(normalized)
+
+    return {"contact": contact, "sections": sections, "header": header, "llm_text": llm_text}
+
+
+def split_windows(text, max_chars, overlap_chars=0):
+    """Split text into windows of at most `max_chars` on line boundaries.
+
+    Consecutive windows share about `overlap_chars` of trailing lines so an
+    entry cut at a boundary appears whole in one of them.
+    """
+    lines = (text or "").splitlines()
+    windows, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) + 1 > max_chars:
+            windows.append("\n".join(current))
+            carry, carried = [], 0
+            for prev in reversed(current):
+                if carried + len(prev) + 1 > overlap_chars:
+                    break
+                carry.insert(0, prev)
+                carried += len(prev) + 1
+            current, size = carry, carried
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        windows.append("\n".join(current))
+    return [w for w in windows if w.strip()]
@@ -0,0 +1,87 @@
+"""Skill name normalization for the candidate_skills inverted index.
+
+Skills are case-folded and mapped through SKILL_ALIASES so that "k8s",
+"K8S" and "Kubernetes" all land on the same indexed skill. Run
+`python skills.py backfill` to (re)build the index for existing candidates.
+"""
+import re
+import sys
+
+# alias key -> (canonical key, display name); keys are compared after _key()
+SKILL_ALIASES = {
+    "k8s": ("kubernetes", "Kubernetes"),
+    "kube": ("kubernetes", "Kubernetes"),
+    "js": ("javascript", "JavaScript"),
+    "ecmascript": ("javascript", "JavaScript"),
+    "ts": ("typescript", "TypeScript"),
+    "py": ("python", "Python"),
+    "python3": ("python", "Python"),
+    "golang": ("go", "Go"),
+    "postgres": ("postgresql", "PostgreSQL"),
+    "psql": ("postgresql", "PostgreSQL"),
+    "mongo": ("mongodb", "MongoDB"),
+    "node": ("nodejs", "Node.js"),
+    "nodejs": ("nodejs", "Node.js"),
+    "reactjs": ("react", "React"),
+    "vuejs": ("vue", "Vue"),
+    "angularjs": ("angular", "Angular"),
+    "amazonwebservices": ("aws", "AWS"),
+    "gcp": ("googlecloud", "Google Cloud"),
+    "googlecloudplatform": ("googlecloud", "Google Cloud"),
+    "msazure": ("azure", "Azure"),
+    "microsoftazure": ("azure", "Azure"),
+    "csharp": ("c#", "C#"),
+    "cpp": ("c++", "C++"),
+    "cplusplus": ("c++", "C++"),
+    "sklearn": ("scikitlearn", "scikit-learn"),
+    "tf": ("tensorflow", "TensorFlow"),
+    "ml": ("machinelearning", "Machine Learning"),
+    "dl": ("deeplearning", "Deep Learning"),
+    "nlp": ("naturallanguageprocessing", "Natural Language Processing"),
+    "cv": ("computervision", "Computer Vision"),
+    "cicd": ("cicd", "CI/CD"),
+    "gitlabci": ("gitlabci", "GitLab CI"),
+    "rest": ("restapis", "REST APIs"),
+    "restapi": ("restapis", "REST APIs"),
+    "restfulapis": ("restapis", "REST APIs"),
+    "mssql": ("sqlserver", "SQL Server"),
+    "microsoftsqlserver": ("sqlserver", "SQL Server"),
+    "excel": ("msexcel", "Excel"),
+    "microsoftexcel": ("msexcel", "Excel"),
+}
+
+
+def _key(skill: str) -> str:
+    """Case-fold and drop separators, keeping characters that distinguish skills (c++, c#, f#)."""
+    key = skill.casefold().strip()
+    key = re.sub(r"\.js$", "js", key)
+    return re.sub(r"[\s.\-_/()]+", "", key)
+
+
+def normalize_skill(skill: str):
+    """Return (canonical key, display name) for a skill, or None if it is blank."""
+    display = re.sub(r"\s+", " ", skill or "").strip().rstrip(".")
+    if not display:
+        return None
+    key = _key(display)
+    if not key:
+        return None
+    if key in SKILL_ALIASES:
+        return SKILL_ALIASES[key]
+    return key, display
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv != ["backfill"]:
+        print("usage: python skills.py backfill")
+        return 2
+    from database import init_db, rebuild_skill_index
+    init_db()
+    count = rebuild_skill_index()
+    print(f"Indexed skills for {count} candidates.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
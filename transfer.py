@@ -0,0 +1,132 @@
+"""Streaming export and import of the candidate database as JSONL or CSV.
+
+Both directions stream: export pages through the table with
+database.iter_candidates, and import reads the file one record at a time and
+saves every `batch_size` profiles in one executemany transaction, so memory
+stays flat however many candidates there are.
+
+    python hr_cli.py export --output backup.jsonl
+    python hr_cli.py import backup.csv --on-conflict skip
+
+In CSV files skills are one comma-separated cell; experience and education
+are JSON cells.
+"""
+import os
+import csv
+import json
+from itertools import islice
+
+from database import iter_candidates, import_candidates_batch, safe_load_json
+from profile_utils import parse_skills
+
+FORMATS = ("jsonl", "csv")
+CSV_FIELDS = ("id", "name", "email", "phone", "linkedin_profile", "summary", "skills", "experience", "education")
+DEFAULT_BATCH_SIZE = 1000
+
+
+def guess_format(path, default="jsonl"):
+    """"csv" or "jsonl" from a file name's extension."""
+    ext = os.path.splitext(str(path or ""))[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    return default
+
+
+# --- Export ---
+def _csv_row(profile):
+    return {
+        "id": profile["id"],
+        "name": profile.get("name") or "",
+        "email": profile.get("email") or "",
+        "phone": profile.get("phone") or "",
+        "linkedin_profile": profile.get("linkedin_profile") or "",
+        "summary": profile.get("summary") or "",
+        "skills": ", ".join(profile.get("skills") or []),
+        "experience": json.dumps(profile.get("experience") or [], ensure_ascii=False),
+        "education": json.dumps(profile.get("education") or [], ensure_ascii=False),
+    }
+
+
+def export_candidates(out, fmt="jsonl"):
+    """Write every candidate to the text stream `out`; returns how many were written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+
+    count = 0
+    for profile in iter_candidates():
+        profile.pop("revision", None)
+        if writer:
+            writer.writerow(_csv_row(profile))
+        else:
+            out.write(json.dumps(profile, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+# --- Import ---
+def iter_jsonl(lines):
+    """Yield one profile per non-blank line of JSON."""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            profile = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {number}: invalid JSON ({e})")
+        if not isinstance(profile, dict):
+            raise ValueError(f"Line {number}: expected a JSON object")
+        yield profile
+
+
+def iter_csv(lines):
+    """Yield one profile per CSV row written by export_candidates (or with the same headers)."""
+    for row in csv.DictReader(lines):
+        skills = row.get("skills") or ""
+        profile = {
+            "name": row.get("name") or "N/A",
+            "email": row.get("email") or "",
+            "phone": row.get("phone") or "",
+            "linkedin_profile": row.get("linkedin_profile") or "",
+            "summary": row.get("summary") or "",
+            # Accept a JSON list too, for files produced by other tools
+            "skills": safe_load_json(skills, []) if skills.startswith("[") else parse_skills(skills),
+            "experience": safe_load_json(row.get("experience"), []),
+            "education": safe_load_json(row.get("education"), []),
+        }
+        if (row.get("id") or "").isdigit():
+            profile["id"] = int(row["id"])
+        yield profile
+
+
+def import_candidates(lines, fmt="jsonl", on_conflict="update", batch_size=DEFAULT_BATCH_SIZE,
+                      flag_duplicates=True, progress=None):
+    """Save every profile read from the text stream `lines`, `batch_size` per transaction.
+
+    Candidates are matched on email, or for profiles without one on their
+    exported ID or phone number (see database.import_candidates_batch), so
+    re-importing a backup updates rather than duplicates.
+    `progress(totals)` is called after each batch. Returns
+    {"inserted", "updated", "skipped"}.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    profiles = iter_csv(lines) if fmt == "csv" else iter_jsonl(lines)
+
+    totals = {"inserted": 0, "updated": 0, "skipped": 0}
+    while True:
+        batch = list(islice(profiles, batch_size))
+        if not batch:
+            return totals
+        for profile in batch:
+            profile.pop("revision", None)
+        for key, value in import_candidates_batch(batch, on_conflict, flag_duplicates).items():
+            totals[key] += value
+        if progress:
+            progress(totals)
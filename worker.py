@@ -0,0 +1,108 @@
+"""Background worker for the resume-parsing job queue (see job_queue.py).
+
+Each worker process runs a few threads that claim queued jobs, extract the
+PDF text, run LLM extraction and store the profile on the job. Jobs queued
+with auto_save also save the candidate. Run as many workers as the LLM rate
+limits allow, independently of the Streamlit app:
+
+    python worker.py --threads 4
+    python worker.py --once          # drain the queue and exit
+"""
+import os
+import sys
+import time
+import socket
+import signal
+import logging
+import argparse
+import threading
+
+from database import init_db
+from data_extractor import extract_pages_from_pdf_bytes, PDFExtractionError, get_profile_data_from_text
+import job_queue
+
+DEFAULT_THREADS = int(os.getenv("WORKER_THREADS", "4"))
+DEFAULT_POLL_SECONDS = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+def process_job(job):
+    """Parse one claimed job. Returns (profile, candidate_id, merged) or raises."""
+    # Long PDFs fan out to the shared page pool, which spawns (not forks) its processes
+    pages = extract_pages_from_pdf_bytes(job["pdf"])
+    resume_text = "".join(pages)
+    if not resume_text.strip():
+        raise PDFExtractionError("Could not read text from the PDF.")
+    profile_data = get_profile_data_from_text(resume_text, pages=pages)
+    if not profile_data or "error" in profile_data:
+        raise RuntimeError((profile_data or {}).get("error", "Could not extract data."))
+
+    candidate_id, merged = None, False
+    if job["auto_save"]:
+        candidate_id, merged = job_queue.save_profile(job["filename"], profile_data)
+    return profile_data, candidate_id, merged
+
+
+def run_one(worker_id):
+    """Claim and run a single job. Returns False when the queue had nothing runnable."""
+    job = job_queue.claim(worker_id)
+    if job is None:
+        return False
+    logger.info("job %s (%s) attempt %d", job["id"], job["filename"], job["attempts"])
+    try:
+        profile, candidate_id, merged = process_job(job)
+    except PDFExtractionError as e:
+        # Unreadable or oversized files won't get better on retry
+        job_queue.fail(job["id"], e, retry=False)
+    except Exception as e:
+        logger.warning("job %s failed: %s", job["id"], e)
+        job_queue.fail(job["id"], e)
+    else:
+        job_queue.complete(job["id"], profile, candidate_id, merged)
+    return True
+
+
+def run_worker(threads=DEFAULT_THREADS, poll_seconds=DEFAULT_POLL_SECONDS, once=False, stop=None):
+    """Run `threads` job loops until `stop` is set (or, with once, until the queue is empty)."""
+    init_db()
+    stop = stop or threading.Event()
+    base_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def loop(n):
+        worker_id = f"{base_id}:{n}"
+        while not stop.is_set():
+            if not run_one(worker_id):
+                if once:
+                    return
+                stop.wait(poll_seconds)
+
+    pool = [threading.Thread(target=loop, args=(n,), daemon=True) for n in range(threads)]
+    for t in pool:
+        t.start()
+    # Join with a timeout so the main thread still handles signals
+    while any(t.is_alive() for t in pool):
+        for t in pool:
+            t.join(timeout=0.5)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process queued resume-parsing jobs.")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="jobs processed concurrently")
+    parser.add_argument("--poll", type=float, default=DEFAULT_POLL_SECONDS, help="seconds between empty polls")
+    parser.add_argument("--once", action="store_true", help="exit when no job is runnable")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    stop = threading.Event()
+    # Finish in-flight jobs on Ctrl+C / SIGTERM instead of leaving them to lease expiry
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    start = time.monotonic()
+    run_worker(args.threads, args.poll, args.once, stop)
+    print(f"Worker stopped after {time.monotonic() - start:.1f}s. Jobs: {job_queue.status_counts()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())